@@ -29,12 +29,33 @@ def core(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
     else:
         parser.print_help()
 
+def serve(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from quaver.server import ProxyServer
+
+    proxy = ProxyServer.create(
+        upstream=args.upstream, cache_size=args.cache_size, rate_limit=args.rate_limit,
+        max_concurrency=args.max_concurrency, timeout=args.timeout
+    )
+    proxy.run(host=args.host, port=args.port)
+
+def add_serve_args(subparser) -> None:
+    parser = subparser.add_parser('serve', help='runs a local caching proxy of the API')
+    parser.set_defaults(func=serve)
+    parser.add_argument('--host', default='127.0.0.1', help='the host to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='the port to listen on (default: 8080)')
+    parser.add_argument('--upstream', default=None, help='the base url of the API (default: https://api.quavergame.com/v1)')
+    parser.add_argument('--cache-size', type=int, default=4096, help='the amount of responses to cache (default: 4096)')
+    parser.add_argument('--rate-limit', type=float, default=None, help='the amount of upstream requests per second')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='the maximum amount of upstream requests in flight')
+    parser.add_argument('--timeout', type=float, default=None, help='the amount of seconds to wait for an upstream request')
 
 
 def parse_args() -> Tuple[argparse.ArgumentParser, argparse.Namespace]:
     parser = argparse.ArgumentParser(prog='quaver', description='Tools for helping with quaver.py')
     parser.add_argument('-v', '--version', action='store_true', help='shows the library version')
     parser.set_defaults(func=core)
+    subparser = parser.add_subparsers(dest='subcommand', title='subcommands')
+    add_serve_args(subparser)
     return parser, parser.parse_args()
 
 
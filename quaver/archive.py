@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from typing import Iterator, List, Optional, Union
+
+from .enums import Priority
+from .errors import NotFound
+
+__all__ = ('MatchArchiver',)
+
+
+class MatchArchiver:
+    """
+    Archives every multiplayer match by walking match ids forward with :meth:`MultiplayerBasedRequests.get_one_match`.
+
+    Matches are written in batches as gzip compressed JSON lines, one gzip
+    member per batch, and a checkpoint is saved next to the archive after
+    every batch so an interrupted run resumes where it stopped. The checkpoint
+    records the size of the archive, a batch written after it is dropped on
+    resume so it is not archived twice.
+
+    Ids which are missing between two existing matches are recorded as
+    gaps. A run of ``gap_tolerance`` missing ids is taken as the end of the
+    available data unless one of the ``probes`` ids further ahead exists,
+    the walk resumes at its first id on the next run.
+
+    Attributes
+    ----------
+    client: Quaver
+        The client to fetch the matches with, requests are made with ``Priority.BACKGROUND``.
+    path: str
+        The path of the archive, the checkpoint is stored at ``path + '.checkpoint'``.
+    concurrency: int
+        The maximum amount of matches fetched at once.
+    batch_size: int
+        The amount of match ids walked before the batch is written.
+    gap_tolerance: int
+        The amount of consecutive missing ids taken as the end of the data.
+    retries: int
+        The amount of times to retry a match when its request fails, e.g. when the
+        API is down, rate limits, times out or the connection is reset.
+    probes: int
+        The amount of ids, ``gap_tolerance`` apart, checked past a run of missing ids
+        before taking it as the end of the data.
+    next_id: int
+        The id of the next match to fetch.
+    gaps: List[int]
+        The ids which are missing between existing matches.
+    archived: int
+        The amount of matches archived since the archiver was created.
+    requests: int
+        The amount of requests made since the archiver was created.
+    """
+
+    __slots__ = (
+        'client', 'path', 'concurrency', 'batch_size', 'gap_tolerance', 'retries', 'probes',
+        'next_id', 'gaps', 'archived', 'requests', '_pending', '_started', '_semaphore'
+    )
+
+    def __init__(
+        self,
+        client,
+        path: Union[str, os.PathLike],
+        *,
+        start: int = 1,
+        concurrency: int = 8,
+        batch_size: int = 100,
+        gap_tolerance: int = 100,
+        retries: int = 3,
+        probes: int = 3
+    ) -> None:
+        self.client = client
+        self.path: str = os.fspath(path)
+        self.concurrency: int = concurrency
+        self.batch_size: int = batch_size
+        self.gap_tolerance: int = gap_tolerance
+        self.retries: int = retries
+        self.probes: int = probes
+        self.next_id: int = start
+        self.gaps: List[int] = []
+        self.archived: int = 0
+        self.requests: int = 0
+        self._pending: List[int] = []
+        self._started: float = time.monotonic()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._load_checkpoint()
+
+    @property
+    def checkpoint_path(self) -> str:
+        return self.path + '.checkpoint'
+
+    @property
+    def rate(self) -> float:
+        """The amount of matches archived per second since the archiver was created."""
+        return self.archived / max(time.monotonic() - self._started, 1e-9)
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return
+        self.next_id = checkpoint['next_id']
+        self.gaps = checkpoint['gaps']
+        self._pending = checkpoint['pending']
+        # drops a batch written after the checkpoint was saved, it is archived again
+        size = checkpoint.get('size')
+        if size is not None and os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+
+    def _save_checkpoint(self) -> None:
+        temporary = self.checkpoint_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({
+                'next_id': self.next_id, 'gaps': self.gaps, 'pending': self._pending,
+                'size': os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            }, f)
+        os.replace(temporary, self.checkpoint_path)
+
+    async def _fetch(self, match_id: int) -> Optional[dict]:
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                self.requests += 1
+                try:
+                    return await self.client.get_one_match(match_id)
+                except NotFound:
+                    return None
+                except Exception:
+                    # APIDown, RequestTimeout, rate limits and other statuses, and connection errors
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+
+    async def _exists_ahead(self, match_id: int) -> bool:
+        ids = [match_id + k * self.gap_tolerance for k in range(1, self.probes + 1)]
+        with self.client.priority(Priority.BACKGROUND), self.client.raw_responses(False):
+            results = await asyncio.gather(*[self._fetch(probe) for probe in ids], return_exceptions=True)
+        return any(result is not None and not isinstance(result, BaseException) for result in results)
+
+    async def archive_batch(self) -> bool:
+        """
+        Fetches and writes the next batch of matches.
+
+        Returns
+        -------
+        bool
+            Whether or not the end of the available data was reached.
+
+        Raises
+        ------
+        Exception
+            The error of a match which still failed after every retry, nothing
+            of the batch is written then.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        ids = range(self.next_id, self.next_id + self.batch_size)
+        with self.client.priority(Priority.BACKGROUND), self.client.raw_responses(False):
+            results = await asyncio.gather(*[self._fetch(match_id) for match_id in ids], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        lines = []
+        for match_id, match in zip(ids, results):
+            if match is None:
+                self._pending.append(match_id)
+                continue
+            self.gaps.extend(self._pending)
+            self._pending = []
+            lines.append(json.dumps(match, separators=(',', ':')))
+
+        if lines:
+            with open(self.path, 'ab') as f:
+                f.write(gzip.compress(('\n'.join(lines) + '\n').encode()))
+            self.archived += len(lines)
+
+        caught_up = len(self._pending) >= self.gap_tolerance and not await self._exists_ahead(ids.stop - 1)
+        if caught_up:
+            self.next_id = self._pending[0]
+            self._pending = []
+        else:
+            self.next_id = ids.stop
+        self._save_checkpoint()
+        return caught_up
+
+    async def run(self, *, follow: bool = False, interval: float = 60.0) -> None:
+        """
+        Archives batches until the end of the available data is reached.
+
+        Parameters
+        ----------
+        follow: bool
+            Whether or not to keep polling for new matches every ``interval`` seconds once caught up.
+        interval: float
+            The amount of seconds to wait between polls when following.
+
+        Raises
+        ------
+        Exception
+            The error of a match which still failed after every retry.
+        """
+        while True:
+            if await self.archive_batch():
+                if not follow:
+                    return
+                await asyncio.sleep(interval)
+
+    def iter_matches(self) -> Iterator[dict]:
+        """
+        Iterates over every archived match in the order they were written.
+        """
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt') as f:
+            for line in f:
+                yield json.loads(line)
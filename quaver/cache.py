@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from typing import Any, Hashable, Optional, Tuple
+
+__all__ = ('TTLCache',)
+
+MISSING: Any = object()
+
+
+class TTLCache:
+    """
+    A least recently used cache whose entries expire after their own ttl.
+
+    The cache is thread-safe, so one cache can be shared by the event loops of several threads.
+
+    Attributes
+    ----------
+    maxsize: int
+        The maximum amount of entries, the least recently used ones are evicted first.
+    """
+
+    __slots__ = ('maxsize', '_data', '_lock')
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize: int = maxsize
+        self._data: collections.OrderedDict[Hashable, Tuple[Optional[float], Any]] = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Returns the value of a key which has not expired, ``default`` otherwise.
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value for ``ttl`` seconds, forever if ttl is None.
+        """
+        with self._lock:
+            self._data[key] = (None if ttl is None else time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
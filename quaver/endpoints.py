@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import re
+import string
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+import multidict
+
+from .enums import GameMode, RankStatus
+from .errors import InvalidArgumentPassed
+from .http import Route
+
+__all__ = ('Endpoint', 'ENDPOINTS', 'find_endpoint')
+
+
+def _mode(value: Any) -> int:
+    return value.value if isinstance(value, GameMode) else (
+        value if value in range(1, 3) else GameMode.FOUR_KEYS.value)
+
+
+def _status(value: Any) -> int:
+    return value.value if isinstance(value, RankStatus) else (
+        value if value in range(1, 3) else RankStatus.RANKED.value)
+
+
+def _limit(value: Any) -> int:
+    return min(int(value), 50)
+
+
+def _unix(value: Any) -> int:
+    return int(value.timestamp())
+
+
+class Endpoint:
+    """
+    Describes a route of the API once: its path template, the query
+    parameters it accepts and how responses to it may be cached and rate
+    limited.
+
+    Attributes
+    ----------
+    name: str
+        The name of the endpoint in :data:`ENDPOINTS`.
+    path: str
+        The path template, e.g. ``/users/{id}/playlists``.
+    method: Literal['GET', 'POST']
+        The HTTP method of the endpoint.
+    params: Dict[str, Callable[[Any], Any]]
+        The query parameters the endpoint accepts, mapped to the function normalizing their values.
+    ttl: Optional[float]
+        The amount of seconds a response may be cached for, None if it should not be cached.
+    cost: int
+        The amount of rate limit tokens a request to the endpoint consumes.
+    immutable: bool
+        Whether or not a response never changes once it exists, and so may be cached forever.
+    key: str
+        The path template with its fields replaced by ``{}``.
+    """
+
+    __slots__ = ('name', 'path', 'method', 'params', 'ttl', 'cost', 'immutable', 'key', '_parts', '_fields', '_static', '_pattern')
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        *,
+        method: Literal['GET', 'POST'] = 'GET',
+        params: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        ttl: Optional[float] = None,
+        cost: int = 1,
+        immutable: bool = False
+    ) -> None:
+        self.name: str = name
+        self.path: str = path
+        self.method: Literal['GET', 'POST'] = method
+        self.params: Dict[str, Callable[[Any], Any]] = params or {}
+        self.ttl: Optional[float] = ttl
+        self.cost: int = cost
+        self.immutable: bool = immutable
+
+        parsed = list(string.Formatter().parse(path))
+        self._parts: Tuple[str, ...] = tuple(literal for literal, _, _, _ in parsed)
+        self._fields: Tuple[str, ...] = tuple(field for _, field, _, _ in parsed if field is not None)
+        self.key: str = '{}'.join(self._parts) if self._fields else path
+        self._static: Optional[Route] = None
+        self._pattern: re.Pattern = re.compile(''.join(
+            re.escape(literal) + ('[^/]+' if field is not None else '') for literal, field, _, _ in parsed) + '$')
+
+    def __repr__(self) -> str:
+        return f'<Endpoint name={self.name!r} path={self.path!r}>'
+
+    @property
+    def cacheable(self) -> bool:
+        return self.immutable or self.ttl is not None
+
+    def match(self, path: str) -> bool:
+        """
+        Returns whether or not a concrete path, e.g. ``/users/1/playlists``, is a path of the endpoint.
+        """
+        return self._pattern.match(path) is not None
+
+    def _format(self, args: Tuple[Any, ...]) -> str:
+        if len(args) != len(self._fields):
+            raise InvalidArgumentPassed(
+                f'{self.name} takes {len(self._fields)} path arguments ({", ".join(self._fields)}), got {len(args)}.')
+        if not args:
+            return self.path
+        parts = self._parts
+        path = parts[0]
+        for index, arg in enumerate(args, 1):
+            path += str(arg)
+            if index < len(parts):
+                path += parts[index]
+        return path
+
+    def route(self, *args: Any, **params: Any) -> Route:
+        """
+        Creates the route of a request to the endpoint.
+
+        Parameters
+        ----------
+        *args: Any
+            The values of the fields of the path template, in order.
+        **params: Any
+            The query parameters, None values are left out and the items of
+            list values are each sent as the parameter.
+
+        Returns
+        -------
+        Route
+            The route to pass to :meth:`HTTPClient.make_request`.
+
+        Raises
+        ------
+        InvalidArgumentPassed
+            If the amount of path arguments is wrong or a parameter is not accepted by the endpoint.
+        """
+        if not args and not params:
+            if self._static is None:
+                self._static = Route(Route.BASE_URL + self.path, self.method, None, self.path, self.key, self)
+            return self._static
+        payload = []
+        for name, value in params.items():
+            if value is None:
+                continue
+            try:
+                normalize = self.params[name]
+            except KeyError:
+                raise InvalidArgumentPassed(
+                    f'{name} is not a valid parameter for {self.name}.') from None
+            if isinstance(value, (list, tuple)):
+                payload.extend((name, normalize(item)) for item in value)
+            else:
+                payload.append((name, normalize(value)))
+        payload = multidict.MultiDict(payload) if len(payload) != len(dict(payload)) else dict(payload)
+        path = self._format(args)
+        return Route(Route.BASE_URL + path, self.method, payload or None, path, self.key, self)
+
+
+ENDPOINTS: Dict[str, Endpoint] = {endpoint.name: endpoint for endpoint in (
+    # users
+    Endpoint('users', '/users', params={'name': str, 'id': int}, ttl=60),
+    Endpoint('user_full', '/users/full/{id}', ttl=60),
+    Endpoint('user_search', '/users/search/{name}', ttl=60),
+    Endpoint('user_best', '/users/scores/best', params={'id': int, 'page': int, 'limit': _limit, 'mode': _mode}, ttl=60),
+    Endpoint('user_recent', '/users/scores/recent', params={'id': int, 'page': int, 'limit': _limit, 'mode': _mode}, ttl=30),
+    Endpoint('user_firstplace', '/users/scores/firstplace', params={'id': int, 'page': int, 'limit': _limit, 'mode': _mode}, ttl=60),
+    Endpoint('user_mapsets', '/users/mapsets/{id}', params={'page': int, 'status': _status, 'mode': _mode}, ttl=300),
+    Endpoint('user_graph', '/users/graph/rank', params={'id': int, 'mode': _mode}, ttl=3600),
+    Endpoint('user_playlists', '/users/{id}/playlists', ttl=300),
+    Endpoint('user_playlist_map', '/users/{id}/playlists/map/{map_id}', ttl=300),
+    Endpoint('user_achievements', '/users/{id}/achievements', ttl=300),
+    # mapsets
+    Endpoint('mapsets_ranked', '/mapsets/ranked', ttl=3600),
+    Endpoint('mapsets_queue', '/mapsets/queue', params={'page': int, 'mode': _status}, ttl=300),
+    Endpoint('mapset', '/mapsets/{id}', ttl=300),
+    Endpoint('mapset_search', '/mapsets/maps/search', params={
+        'search': str, 'mode': _mode, 'status': _status, 'page': int, 'limit': int,
+        'mindiff': int, 'maxdiff': int, 'minbpm': int, 'maxbpm': int,
+        'minlns': int, 'maxlns': int, 'minplaycount': int, 'maxplaycount': int,
+        'mindate': _unix, 'maxdate': _unix,
+    }, ttl=300, cost=2),
+    Endpoint('mapset_comments', '/mapsets/{id}/comments', ttl=60),
+    # maps and scores
+    Endpoint('map', '/maps/{id}/', ttl=300),
+    Endpoint('map_scores', '/scores/map/{id}/', ttl=60),
+    Endpoint('score_data', '/scores/data/{id}', immutable=True),
+    # leaderboards
+    Endpoint('leaderboard', '/leaderboards', params={'mode': _mode, 'page': int, 'country': str}, ttl=60),
+    Endpoint('leaderboard_hits', '/leaderboards/hits', params={'page': int}, ttl=60),
+    # playlists
+    Endpoint('playlist', '/playlists/{id}', ttl=300),
+    Endpoint('playlist_maps', '/playlists/{id}/maps', ttl=300),
+    Endpoint('playlist_search', '/playlists/all/search', params={'search': str, 'page': int}, ttl=300),
+    # multiplayer
+    Endpoint('multiplayer_games', '/multiplayer/games', ttl=10),
+    Endpoint('multiplayer_game', '/multiplayer/games/{id}', ttl=10),
+    Endpoint('multiplayer_game_live', '/multiplayer/games/{id}/live', ttl=5),
+    Endpoint('multiplayer_leaderboard', '/multiplayer/leaderboard', params={'mode': _mode, 'page': int}, ttl=60),
+    Endpoint('multiplayer_match', '/multiplayer/match/{id}', immutable=True),
+    # misc
+    Endpoint('team', '/team', ttl=3600),
+    Endpoint('stats', '/stats', ttl=60),
+    Endpoint('stats_country', '/stats/country', ttl=300),
+)}
+
+
+# endpoints without fields first, so /mapsets/ranked is not taken for /mapsets/{id}
+_BY_SPECIFICITY: Tuple[Endpoint, ...] = tuple(sorted(ENDPOINTS.values(), key=lambda endpoint: len(endpoint._fields)))
+
+
+def find_endpoint(path: str) -> Optional[Endpoint]:
+    """
+    Returns the endpoint a concrete path belongs to, None if it is unknown.
+    """
+    for endpoint in _BY_SPECIFICITY:
+        if endpoint.match(path):
+            return endpoint
+    return None
@@ -22,3 +22,14 @@ class RankStatus(Enum):
     def __int__(self):
         return self.value
     
+
+class Priority(Enum):
+    """
+    Enum for the priority classes of requests, lower values are sent first.
+    """
+    INTERACTIVE: int = 0
+    DEFAULT:     int = 1
+    BACKGROUND:  int = 2
+
+    def __int__(self):
+        return self.value
@@ -1,3 +1,7 @@
+import asyncio
+
+__all__ = ('QuaverError', 'APIDown', 'InvalidArgumentPassed', 'RequestTimeout', 'NotFound', 'HTTPException')
+
 class QuaverError(Exception):
     """Base class for exceptions in this module."""
     pass
@@ -20,4 +24,38 @@ class InvalidArgumentPassed(QuaverError):
     """
 
     def __init__(self, message):
-        self.message = message
\ No newline at end of file
+        self.message = message
+
+class RequestTimeout(QuaverError, asyncio.TimeoutError):
+    """Exception raised when a request does not finish within its timeout or deadline.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+class NotFound(QuaverError):
+    """Exception raised when the requested resource does not exist.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+class HTTPException(QuaverError):
+    """Exception raised when the API answers with an unexpected status, e.g. 429 when rate limited.
+
+    Attributes:
+        message -- explanation of the error
+        status -- the HTTP status of the response
+    """
+
+    def __init__(self, message, status):
+        self.message = message
+        self.status = status
\ No newline at end of file
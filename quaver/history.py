@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+from .enums import GameMode
+from .errors import InvalidArgumentPassed
+from .utils import to_timestamp
+
+__all__ = ('RankHistoryStore',)
+
+
+class RankHistoryStore:
+    """
+    An append-only store of the rank history of users, fed by :meth:`UserBasedRequests.get_user_graph`.
+
+    The history of every user and mode is kept in its own file of fixed size
+    ``(timestamp, rank)`` records sorted by timestamp. Only the points newer
+    than the last stored one are appended and reads memory-map the file, so
+    range queries never parse JSON or load the whole history.
+
+    Requires NumPy, which can be installed with ``pip install quaver.py[numpy]``.
+
+    Attributes
+    ----------
+    directory: str
+        The directory the history files are stored in.
+    """
+
+    DTYPE = np.dtype([('timestamp', '<i8'), ('rank', '<i4')])
+
+    __slots__ = ('directory', '_last')
+
+    def __init__(self, directory: Union[str, os.PathLike]) -> None:
+        self.directory: str = os.fspath(directory)
+        self._last: Dict[Tuple[int, int], int] = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, user_id: int, mode: int) -> str:
+        return os.path.join(self.directory, f'{user_id}-{mode}.rank')
+
+    def _truncate(self, path: str) -> int:
+        # drops the partial record a torn write left at the end of the file
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        torn = size % self.DTYPE.itemsize
+        if torn:
+            with open(path, 'r+b') as f:
+                f.truncate(size - torn)
+        return size - torn
+
+    def _load(self, user_id: int, mode: Union[GameMode, int]) -> np.ndarray:
+        path = self._path(user_id, int(mode))
+        if not self._truncate(path):
+            return np.empty(0, dtype=self.DTYPE)
+        return np.memmap(path, dtype=self.DTYPE, mode='r')
+
+    def last_timestamp(self, user_id: int, mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value) -> Optional[int]:
+        """
+        Returns the timestamp of the newest stored point.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        mode: Union[GameMode, int]
+            The mode of the history.
+
+        Returns
+        -------
+        Optional[int]
+            The unix timestamp of the newest point, None if nothing is stored.
+        """
+        key = (user_id, int(mode))
+        if key not in self._last:
+            points = self._load(user_id, mode)
+            if not len(points):
+                return None
+            self._last[key] = int(points['timestamp'][-1])
+        return self._last[key]
+
+    def append(self, user_id: int, mode: Union[GameMode, int], response: dict) -> int:
+        """
+        Appends the points of a graph that are newer than the stored ones.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        mode: Union[GameMode, int]
+            The mode of the graph.
+        response: dict
+            The response of :meth:`UserBasedRequests.get_user_graph`.
+
+        Returns
+        -------
+        int
+            The amount of points that were appended.
+        """
+        statistics = response.get('statistics', [])
+        points = np.fromiter(
+            ((to_timestamp(point['timestamp']), point['rank']) for point in statistics),
+            dtype=self.DTYPE, count=len(statistics)
+        )
+        points.sort(order='timestamp', kind='stable')
+        last = self.last_timestamp(user_id, mode)
+        if last is not None:
+            points = points[points['timestamp'] > last]
+        if not len(points):
+            return 0
+        path = self._path(user_id, int(mode))
+        self._truncate(path)
+        with open(path, 'ab') as f:
+            f.write(points.tobytes())
+        self._last[(user_id, int(mode))] = int(points['timestamp'][-1])
+        return len(points)
+
+    async def sync(self, client, user_id: int, mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value) -> int:
+        """
+        Fetches the graph of a user and appends its new points.
+
+        Parameters
+        ----------
+        client: Quaver
+            The client to fetch the graph with.
+        user_id: int
+            The id of the user.
+        mode: Union[GameMode, int]
+            The mode of the graph.
+
+        Returns
+        -------
+        int
+            The amount of points that were appended.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        """
+        with client.raw_responses(False):
+            response = await client.get_user_graph(user_id, mode=mode)
+        return self.append(user_id, mode, response)
+
+    def range(
+        self,
+        user_id: int,
+        mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Returns the stored points within a time range.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        mode: Union[GameMode, int]
+            The mode of the history.
+        start: Optional[int]
+            The unix timestamp to start at, inclusive.
+        end: Optional[int]
+            The unix timestamp to end at, exclusive.
+
+        Returns
+        -------
+        numpy.ndarray
+            A read-only view of ``(timestamp, rank)`` records.
+        """
+        points = self._load(user_id, mode)
+        timestamps = points['timestamp']
+        low = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        high = len(points) if end is None else np.searchsorted(timestamps, end, side='left')
+        return points[low:high]
+
+    def downsample(
+        self,
+        user_id: int,
+        mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value,
+        *,
+        interval: int = 86400,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        how: Literal['last', 'min', 'max'] = 'last'
+    ) -> np.ndarray:
+        """
+        Returns one point per ``interval`` seconds within a time range.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        mode: Union[GameMode, int]
+            The mode of the history.
+        interval: int
+            The size of every bucket in seconds.
+        start: Optional[int]
+            The unix timestamp to start at, inclusive.
+        end: Optional[int]
+            The unix timestamp to end at, exclusive.
+        how: Literal['last', 'min', 'max']
+            Whether to keep the last, the best (lowest) or the worst (highest) rank of every bucket.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(timestamp, rank)`` records where the timestamp is the start of the bucket.
+
+        Raises
+        ------
+        InvalidArgumentPassed
+            If the downsampling method is unknown.
+        """
+        points = self.range(user_id, mode, start=start, end=end)
+        if not len(points):
+            return np.empty(0, dtype=self.DTYPE)
+        buckets = points['timestamp'] // interval
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        result = np.empty(len(starts), dtype=self.DTYPE)
+        result['timestamp'] = buckets[starts] * interval
+        ranks = points['rank']
+        if how == 'last':
+            result['rank'] = ranks[np.r_[starts[1:] - 1, len(points) - 1]]
+        elif how == 'min':
+            result['rank'] = np.minimum.reduceat(ranks, starts)
+        elif how == 'max':
+            result['rank'] = np.maximum.reduceat(ranks, starts)
+        else:
+            raise InvalidArgumentPassed(f'{how} is not a valid downsampling method.')
+        return result
@@ -1,49 +1,392 @@
 from __future__ import annotations
 
-from typing import Literal, Optional, Union
+import asyncio
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, List, Optional, Tuple, Union
 
 import aiohttp
 
-from .errors import APIDown
+from .cache import MISSING, TTLCache
+from .enums import Priority
+from .errors import APIDown, HTTPException, NotFound, RequestTimeout
+from .scheduler import RequestScheduler
+from .stats import AccessStats
+
+_KEY_RE = re.compile(r'/(?:\d+|[0-9a-fA-F]{32})(?=/|$)')
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('quaver_deadline', default=None)
+_fresh: contextvars.ContextVar[bool] = contextvars.ContextVar('quaver_fresh', default=False)
+_raw: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar('quaver_raw', default=None)
+_priority: contextvars.ContextVar[Tuple[Priority, Hashable]] = contextvars.ContextVar('quaver_priority', default=(Priority.DEFAULT, None))
 
 
 class Route:
     BASE_URL = "https://api.quavergame.com/v1"
 
-    __slots__ = ('url', 'method', 'params')
+    __slots__ = ('url', 'method', 'params', 'path', 'key', 'endpoint')
 
-    def __init__(self, url, method, params) -> None:
+    def __init__(self, url, method, params, path=None, key=None, endpoint=None) -> None:
         self.method = method
         self.url = url
         self.params = params
+        self.path = path
+        # the path with its ids replaced by {}, used to group latencies
+        self.key = key or _KEY_RE.sub('/{}', path or url)
+        self.endpoint = endpoint
+
+    @property
+    def cache_key(self) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+        return self.url, tuple(self.params.items()) if self.params else ()
+
+
+class Response:
+    """
+    The undecoded body of a response, decoded at most once and only when needed.
+
+    Attributes
+    ----------
+    body: bytes
+        The body of the response.
+    """
+
+    __slots__ = ('body', '_data')
+
+    def __init__(self, body: bytes) -> None:
+        self.body: bytes = body
+        self._data: Any = MISSING
+
+    def json(self) -> Any:
+        if self._data is MISSING:
+            self._data = json.loads(self.body)
+        return self._data
+
+
+class RateLimiter:
+    """
+    A token bucket allowing ``rate`` tokens per second with bursts of up to ``burst`` tokens.
+
+    A request costing more than ``burst`` waits for a full bucket and leaves
+    it in debt, so it is still sent and the average rate is kept.
+    """
+
+    __slots__ = ('rate', 'burst', '_tokens', '_updated', '_lock')
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate: float = rate
+        self.burst: float = burst if burst is not None else rate
+        self._tokens: float = self.burst
+        self._updated: float = time.monotonic()
+        # the bucket is shared by the event loops of every thread
+        self._lock: threading.Lock = threading.Lock()
+
+    async def acquire(self, cost: float = 1) -> None:
+        """
+        Waits until ``cost`` tokens, or a full bucket, are available and consumes them.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                needed = min(cost, self.burst)
+                if self._tokens >= needed:
+                    self._tokens -= cost
+                    return
+                missing = needed - self._tokens
+            await asyncio.sleep(missing / self.rate)
+
+
+class _LoopState:
+    """
+    The parts of an HTTPClient bound to one event loop.
+    """
+
+    __slots__ = ('session', 'scheduler', 'inflight')
 
-    @classmethod
-    def create(cls, path: str, method: Literal['GET', 'POST'], params: Optional[Union[dict, aiohttp.MultiDict]] = None) -> Route:
-        url = cls.BASE_URL + path
-        return cls(url, method, params)
+    def __init__(self, session: aiohttp.ClientSession, scheduler: Optional[RequestScheduler]) -> None:
+        self.session: aiohttp.ClientSession = session
+        self.scheduler: Optional[RequestScheduler] = scheduler
+        # identical requests in flight, mapped to the task fetching them and its amount of waiters
+        self.inflight: Dict[Hashable, List[Any]] = {}
 
 
 class HTTPClient:
-    def __init__(self, session: aiohttp.ClientSession):
-        self.__session: aiohttp.ClientSession = session
+    """
+    Sends the requests of a :class:`Quaver` client.
 
-    async def _require_session(self) -> None:
-        if not self.__session:
-            self.__session = aiohttp.ClientSession()
+    The client may be used from several event loops at once, e.g. one per
+    worker thread. Every loop gets its own aiohttp session, scheduler and
+    in-flight requests, while the cache, rate limiter, access statistics
+    and latency samples are shared by all of them and guarded by locks.
+    """
 
-    async def make_request(self, route: Route) -> aiohttp.ClientResponse:
-        await self._require_session()
-        async with self.__session.request(route.method, route.url, params=route.params) as response:
-            print(response.url)
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        timeout: Optional[float] = None,
+        route_timeouts: Optional[Dict[str, float]] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        cache_size: int = 0,
+        rate_limit: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        tenant_weights: Optional[Dict[Hashable, float]] = None,
+        raw: bool = False,
+        base_url: Optional[str] = None
+    ):
+        self.__session: Optional[aiohttp.ClientSession] = session
+        self.max_concurrency: Optional[int] = max_concurrency
+        self.tenant_weights: Optional[Dict[Hashable, float]] = tenant_weights
+        self.raw: bool = raw
+        self.base_url: Optional[str] = base_url.rstrip('/') if base_url else None
+        self.observers: List[Callable[[Route, Response], None]] = []
+        self.stats: AccessStats = AccessStats()
+        self.cache: Optional[TTLCache] = TTLCache(cache_size) if cache_size else None
+        self.limiter: Optional[RateLimiter] = RateLimiter(rate_limit) if rate_limit else None
+        self.timeout: Optional[float] = timeout
+        self.route_timeouts: Dict[str, float] = dict(sorted((route_timeouts or {}).items(), key=lambda item: -len(item[0])))
+        self.hedge: bool = hedge
+        self.hedge_quantile: float = hedge_quantile
+        self.hedge_min_samples: int = hedge_min_samples
+        self._latencies: Dict[str, Deque[float]] = collections.defaultdict(lambda: collections.deque(maxlen=256))
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is not None:
+            return state
+        with self._lock:
+            # forget the loops which were closed without closing the client
+            for closed in [other for other in self._loops if other.is_closed()]:
+                del self._loops[closed]
+            state = self._loops.get(loop)
+            if state is None:
+                # the given session is used by the first loop, as it is bound to it
+                session, self.__session = self.__session, None
+                if session is None or session.closed:
+                    session = aiohttp.ClientSession()
+                scheduler = RequestScheduler(self.max_concurrency, self.tenant_weights) if self.max_concurrency else None
+                state = self._loops[loop] = _LoopState(session, scheduler)
+        return state
+
+    @property
+    def scheduler(self) -> Optional[RequestScheduler]:
+        """The scheduler of the running event loop, None if ``max_concurrency`` is not set."""
+        return self._state().scheduler
+
+    @contextlib.contextmanager
+    def deadline(self, seconds: float) -> Iterator[None]:
+        """
+        Bounds every request made within the block, including the ones fanned
+        out into tasks by ``asyncio.gather``, to finish within ``seconds``.
+
+        Nested deadlines can only shorten the outer one.
+        """
+        deadline = asyncio.get_running_loop().time() + seconds
+        current = _deadline.get()
+        token = _deadline.set(deadline if current is None else min(current, deadline))
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    @contextlib.contextmanager
+    def fresh_responses(self) -> Iterator[None]:
+        """
+        Makes every request within the block skip the cached responses and
+        fetch them from the API, the fetched responses still refresh the cache.
+        """
+        token = _fresh.set(True)
+        try:
+            yield
+        finally:
+            _fresh.reset(token)
+
+    @contextlib.contextmanager
+    def raw_responses(self, enabled: bool = True) -> Iterator[None]:
+        """
+        Makes every request within the block return the undecoded body of
+        the response when ``enabled``, or the decoded JSON otherwise.
+        """
+        token = _raw.set(enabled)
+        try:
+            yield
+        finally:
+            _raw.reset(token)
+
+    @contextlib.contextmanager
+    def priority(self, priority: Priority, tenant: Hashable = None) -> Iterator[None]:
+        """
+        Schedules every request made within the block, including the ones
+        fanned out into tasks, with the given priority class and tenant.
+        """
+        token = _priority.set((priority, tenant))
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    def _timeout_for(self, route: Route) -> Optional[float]:
+        timeout = self.timeout
+        path = route.path or route.url
+        for prefix, route_timeout in self.route_timeouts.items():
+            if path.startswith(prefix):
+                timeout = route_timeout
+                break
+        deadline = _deadline.get()
+        if deadline is not None:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise RequestTimeout(f"Deadline exceeded before requesting {self._url_for(route)}")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def _hedge_delay(self, route: Route) -> Optional[float]:
+        with self._lock:
+            samples = self._latencies.get(route.key)
+            if not samples or len(samples) < self.hedge_min_samples:
+                return None
+            samples = sorted(samples)
+        return samples[int(self.hedge_quantile * (len(samples) - 1))]
+
+    async def _send(self, route: Route) -> Response:
+        cost = route.endpoint.cost if route.endpoint is not None else 1
+        scheduler = self._state().scheduler
+        if scheduler is None:
+            return await self._send_now(route, cost)
+        priority, tenant = _priority.get()
+        await scheduler.acquire(priority, tenant, cost)
+        try:
+            return await self._send_now(route, cost)
+        finally:
+            scheduler.release()
+
+    def _url_for(self, route: Route) -> str:
+        if self.base_url is None or route.path is None:
+            return route.url
+        return self.base_url + route.path
+
+    async def _send_now(self, route: Route, cost: int) -> Response:
+        if self.limiter is not None:
+            await self.limiter.acquire(cost)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with self._state().session.request(route.method, self._url_for(route), params=route.params) as response:
             if response.ok:
-                return await response.json()
+                body = await response.read()
+                with self._lock:
+                    self._latencies[route.key].append(loop.time() - started)
+                return Response(body)
             elif response.status == 500:
                 raise APIDown("API is down please try again later")
+            elif response.status == 404:
+                raise NotFound(f"{self._url_for(route)} was not found")
+            elif response.status == 504:
+                raise RequestTimeout(f"{self._url_for(route)} timed out upstream")
             else:
-                raise Exception(f"{response.status} {response.reason}")
+                raise HTTPException(f"{response.status} {response.reason}", response.status)
 
-    async def close(self) -> None:
-        if not self.__session.closed:
-            await self.__session.close()
+    async def _send_hedged(self, route: Route, delay: float) -> Response:
+        tasks = {asyncio.ensure_future(self._send(route))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.add(asyncio.ensure_future(self._send(route)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def make_request(self, route: Route, *, record: bool = True, raw: Optional[bool] = None) -> Union[Any, bytes]:
+        if raw is None:
+            raw = _raw.get()
+            if raw is None:
+                raw = self.raw
+        response = await self._fetch(route, record)
+        return response.body if raw else response.json()
 
-    
+    async def _fetch(self, route: Route, record: bool) -> Response:
+        endpoint = route.endpoint
+        if record:
+            self.stats.record(route)
+        cacheable = self.cache is not None and endpoint is not None and endpoint.cacheable
+        if cacheable and not _fresh.get():
+            response = self.cache.get(route.cache_key, MISSING)
+            if response is not MISSING:
+                return response
+        inflight = self._state().inflight
+        timeout = self._timeout_for(route)
+        if route.method != 'GET':
+            request = self._load(route, cacheable)
+        else:
+            # identical requests of the same priority class share the one in flight,
+            # which is only cancelled once every request waiting for it gave up
+            key = (route.cache_key, _priority.get()[0])
+            entry = inflight.get(key)
+            if entry is None:
+                entry = inflight[key] = [asyncio.ensure_future(self._load(route, cacheable)), 0]
+                entry[0].add_done_callback(functools.partial(self._inflight_done, inflight, key))
+            request = asyncio.shield(entry[0])
+            entry[1] += 1
+        try:
+            response = await asyncio.wait_for(request, timeout)
+        except RequestTimeout:
+            raise
+        except asyncio.TimeoutError:
+            raise RequestTimeout(f"{self._url_for(route)} did not respond within {timeout:.2f} seconds") from None
+        finally:
+            if route.method == 'GET':
+                entry[1] -= 1
+                if not entry[1] and not entry[0].done():
+                    entry[0].cancel()
+                    if inflight.get(key) is entry:
+                        del inflight[key]
+        # only cached responses are shared, every caller of a shared request decodes its own copy
+        return response if cacheable else Response(response.body)
+
+    @staticmethod
+    def _inflight_done(inflight: Dict[Hashable, List[Any]], key: Hashable, task: asyncio.Future) -> None:
+        if inflight.get(key, [None])[0] is task:
+            del inflight[key]
+        if not task.cancelled():
+            # retrieved so an error nobody waits for anymore is not logged
+            task.exception()
+
+    async def _load(self, route: Route, cacheable: bool) -> Response:
+        delay = self._hedge_delay(route) if self.hedge and route.method == 'GET' else None
+        response = await (self._send(route) if delay is None else self._send_hedged(route, delay))
+        if cacheable:
+            endpoint = route.endpoint
+            self.cache.set(route.cache_key, response, None if endpoint.immutable else endpoint.ttl)
+        for observer in self.observers:
+            observer(route, response)
+        return response
+
+    async def close(self) -> None:
+        """
+        Closes the session of the running event loop, every loop which used
+        the client has to close it before it stops.
+        """
+        with self._lock:
+            state = self._loops.pop(asyncio.get_running_loop(), None)
+        session = state.session if state is not None else self.__session
+        if session is not None and not session.closed:
+            await session.close()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .enums import GameMode
+
+__all__ = ('RankChange', 'LeaderboardWatcher')
+
+
+class RankChange(NamedTuple):
+    """
+    A change of rank of a user on a leaderboard.
+
+    ``old_rank`` is None when the user entered the watched pages and
+    ``new_rank`` is None when the user left them.
+    """
+    user_id: int
+    username: Optional[str]
+    old_rank: Optional[int]
+    new_rank: Optional[int]
+    timestamp: float
+
+
+class LeaderboardWatcher:
+    """
+    Watches a leaderboard and emits the rank changes between polls.
+
+    Every poll refetches the first page, the pages which changed during the
+    previous poll along with their neighbours and ``sweep`` other pages in
+    round robin, so that every page is refreshed eventually. When the first
+    or last user of a fetched page differs from the snapshot, someone
+    crossed that page boundary and the neighbouring page is probed in the
+    same poll.
+
+    The rank history is kept as a delta of every poll with a full keyframe
+    every ``keyframe_interval`` deltas, which keeps :meth:`rank_at` cheap.
+
+    Attributes
+    ----------
+    client: Quaver
+        The client to fetch the leaderboard with.
+    country: Optional[str]
+        The country of the leaderboard, None for the global one.
+    multiplayer: bool
+        Whether or not to watch the multiplayer leaderboard instead.
+    mode: Union[GameMode, int]
+        The mode of the leaderboard.
+    pages: int
+        The amount of pages to watch.
+    sweep: int
+        The amount of otherwise unchanged pages to refetch every poll.
+    keyframe_interval: int
+        The amount of deltas between two keyframes of the history.
+    """
+
+    __slots__ = (
+        'client', 'country', 'multiplayer', 'mode', 'pages', 'sweep', 'keyframe_interval',
+        '_page_size', '_snapshot', '_ranks', '_names', '_dirty', '_cursor',
+        '_keyframes', '_keyframe_times', '_deltas', '_delta_times'
+    )
+
+    def __init__(
+        self,
+        client,
+        *,
+        country: Optional[str] = None,
+        multiplayer: bool = False,
+        mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value,
+        pages: int = 10,
+        sweep: int = 1,
+        keyframe_interval: int = 50
+    ) -> None:
+        self.client = client
+        self.country: Optional[str] = country
+        self.multiplayer: bool = multiplayer
+        self.mode: Union[GameMode, int] = mode
+        self.pages: int = pages
+        self.sweep: int = sweep
+        self.keyframe_interval: int = keyframe_interval
+        self._page_size: Optional[int] = None
+        self._snapshot: Dict[int, List[int]] = {}
+        self._ranks: Dict[int, int] = {}
+        self._names: Dict[int, str] = {}
+        self._dirty: Set[int] = set(range(pages))
+        self._cursor: int = 0
+        self._keyframes: List[Tuple[int, Dict[int, int]]] = []
+        self._keyframe_times: List[float] = []
+        self._deltas: List[Dict[int, Optional[int]]] = []
+        self._delta_times: List[float] = []
+
+    async def _fetch(self, page: int) -> List[dict]:
+        # polls must see the current pages, not the ones cached by earlier calls or prewarm
+        with self.client.raw_responses(False), self.client.fresh_responses():
+            if self.multiplayer:
+                response = await self.client.get_multiplayer_leaderboard(paginate=page, mode=self.mode)
+            else:
+                response = await self.client.get_leaderboard(country=self.country, mode=self.mode, pagination=page)
+        return response.get('users', [])
+
+    def _schedule(self) -> Set[int]:
+        pages = {0} | self._dirty
+        for page in list(self._dirty):
+            pages.update((page - 1, page + 1))
+        for _ in range(self.sweep):
+            pages.add(self._cursor)
+            self._cursor = (self._cursor + 1) % self.pages
+        return {page for page in pages if 0 <= page < self.pages}
+
+    async def poll(self) -> List[RankChange]:
+        """
+        Refetches the pages likely to have changed and returns the rank changes since the last poll.
+
+        Returns
+        -------
+        List[RankChange]
+            The rank changes, empty if nothing changed.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        """
+        pending = self._schedule()
+        fetched: Dict[int, List[dict]] = {}
+        while pending:
+            pages = sorted(pending)
+            results = await asyncio.gather(*[self._fetch(page) for page in pages])
+            pending = set()
+            for page, users in zip(pages, results):
+                fetched[page] = users
+                if page == 0 and users:
+                    self._page_size = self._page_size or len(users)
+                old = self._snapshot.get(page, [])
+                ids = [user['id'] for user in users]
+                if ids[:1] != old[:1] and page - 1 not in fetched:
+                    pending.add(page - 1)
+                if ids[-1:] != old[-1:] and page + 1 not in fetched:
+                    pending.add(page + 1)
+            pending = {page for page in pending if 0 <= page < self.pages and page not in fetched}
+
+        now = time.time()
+        delta: Dict[int, Optional[int]] = {}
+        self._dirty = set()
+        removed: Set[int] = set()
+        size = self._page_size or 50
+        for page, users in fetched.items():
+            ids = [user['id'] for user in users]
+            old = self._snapshot.get(page, [])
+            if ids == old:
+                continue
+            self._dirty.add(page)
+            removed.update(set(old) - set(ids))
+            self._snapshot[page] = ids
+            for index, user in enumerate(users):
+                rank = page * size + index + 1
+                self._names[user['id']] = user.get('username')
+                if self._ranks.get(user['id']) != rank:
+                    delta[user['id']] = rank
+        if removed:
+            present = {user_id for ids in self._snapshot.values() for user_id in ids}
+            for user_id in removed - present:
+                if user_id in self._ranks:
+                    delta[user_id] = None
+
+        changes = []
+        for user_id, rank in delta.items():
+            changes.append(RankChange(user_id, self._names.get(user_id), self._ranks.get(user_id), rank, now))
+            if rank is None:
+                del self._ranks[user_id]
+            else:
+                self._ranks[user_id] = rank
+        if delta:
+            self._record(now, delta)
+        return changes
+
+    def _record(self, timestamp: float, delta: Dict[int, Optional[int]]) -> None:
+        if len(self._deltas) % self.keyframe_interval == 0:
+            self._keyframes.append((len(self._deltas), dict(self._ranks)))
+            self._keyframe_times.append(timestamp)
+        self._deltas.append(delta)
+        self._delta_times.append(timestamp)
+
+    def rank_of(self, user_id: int) -> Optional[int]:
+        """
+        Returns the current rank of a user, None if the user is not within the watched pages.
+        """
+        return self._ranks.get(user_id)
+
+    def rank_at(self, user_id: int, timestamp: float) -> Optional[int]:
+        """
+        Returns the rank a user had at a point in time.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        timestamp: float
+            The unix timestamp to get the rank at.
+
+        Returns
+        -------
+        Optional[int]
+            The rank of the user, None if the user was not within the watched pages.
+        """
+        position = bisect.bisect_right(self._keyframe_times, timestamp) - 1
+        if position < 0:
+            return None
+        start, ranks = self._keyframes[position]
+        rank = ranks.get(user_id)
+        end = bisect.bisect_right(self._delta_times, timestamp)
+        for delta in self._deltas[start:end]:
+            if user_id in delta:
+                rank = delta[user_id]
+        return rank
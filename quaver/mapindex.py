@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+__all__ = ('MapIdIndex',)
+
+# the endpoints whose responses contain full maps
+_MAP_ENDPOINTS = frozenset(('map', 'mapset', 'mapset_search', 'user_mapsets', 'playlist_maps'))
+
+
+def _iter_maps(data: Any) -> Iterator[dict]:
+    if not isinstance(data, dict):
+        return
+    beatmap = data.get('map')
+    if isinstance(beatmap, dict):
+        yield beatmap
+    maps = data.get('maps')
+    if isinstance(maps, list):
+        yield from (beatmap for beatmap in maps if isinstance(beatmap, dict))
+    for key in ('mapset', 'mapsets', 'playlist'):
+        value = data.get(key)
+        for mapset in (value if isinstance(value, list) else [value]):
+            if isinstance(mapset, dict):
+                yield from (beatmap for beatmap in mapset.get('maps', ()) if isinstance(beatmap, dict))
+
+
+def _map_pairs(maps: Iterable[dict]) -> Iterator[Tuple[str, int]]:
+    for beatmap in maps:
+        if beatmap.get('id') is None:
+            continue
+        if beatmap.get('md5'):
+            yield beatmap['md5'], beatmap['id']
+        if beatmap.get('alternative_md5'):
+            yield beatmap['alternative_md5'], beatmap['id']
+
+
+class MapIdIndex:
+    """
+    A persistent, bidirectional index between the md5 hashes of maps and their ids.
+
+    The index is kept in memory and, when a path is given, mirrored to a
+    SQLite database so it survives restarts. Passing the index to
+    :class:`Quaver` fills it from every map and mapset response that passes
+    through the client and lets :meth:`MapBasedRequests.get_map` address
+    maps known by their md5 by their id instead, so both forms share the
+    same cache entries.
+
+    The index is thread-safe, lookups read the in memory copy and writes to
+    the database are serialized by a lock. The pairs learned from responses
+    are written in batches off the event loop, see :meth:`flush`.
+
+    Attributes
+    ----------
+    path: Optional[str]
+        The path of the SQLite database, None if the index is only kept in memory.
+    """
+
+    __slots__ = ('path', '_ids', '_md5s', '_connection', '_lock', '_write_lock', '_unsaved', '_saved')
+
+    # the amount of unsaved pairs and seconds after which the pairs learned from responses are written
+    FLUSH_SIZE = 256
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self, path: Optional[Union[str, os.PathLike]] = None) -> None:
+        self.path: Optional[str] = os.fspath(path) if path is not None else None
+        self._ids: Dict[str, int] = {}
+        self._md5s: Dict[int, str] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._write_lock: threading.Lock = threading.Lock()
+        self._unsaved: List[Tuple[str, int]] = []
+        self._saved: float = time.monotonic()
+        if self.path is not None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS maps (md5 TEXT PRIMARY KEY, map_id INTEGER NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS maps_map_id ON maps (map_id)')
+            for md5, map_id in self._connection.execute('SELECT md5, map_id FROM maps'):
+                self._ids[md5] = map_id
+                self._md5s.setdefault(map_id, md5)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: Union[int, str]) -> bool:
+        return key in (self._ids if isinstance(key, str) else self._md5s)
+
+    def get_id(self, md5: str) -> Optional[int]:
+        """
+        Returns the id of the map with an md5 hash, None if it is unknown.
+        """
+        return self._ids.get(md5.lower())
+
+    def get_md5(self, map_id: int) -> Optional[str]:
+        """
+        Returns the md5 hash of the map with an id, None if it is unknown.
+        """
+        return self._md5s.get(map_id)
+
+    def add(self, pairs: Iterable[Tuple[str, int]]) -> int:
+        """
+        Adds ``(md5, map_id)`` pairs to the index.
+
+        Returns
+        -------
+        int
+            The amount of pairs which were not known yet.
+        """
+        new = self._remember(pairs)
+        self._write(new)
+        return len(new)
+
+    def add_maps(self, maps: Iterable[dict]) -> int:
+        """
+        Adds maps as returned by the API, including their alternative md5 hashes.
+
+        Returns
+        -------
+        int
+            The amount of pairs which were not known yet.
+        """
+        return self.add(_map_pairs(maps))
+
+    def _remember(self, pairs: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        new = []
+        with self._lock:
+            for md5, map_id in pairs:
+                md5 = md5.lower()
+                if self._ids.get(md5) != map_id:
+                    self._ids[md5] = map_id
+                    self._md5s.setdefault(map_id, md5)
+                    new.append((md5, map_id))
+        return new
+
+    def _write(self, pairs: List[Tuple[str, int]]) -> None:
+        with self._write_lock:
+            if pairs and self._connection is not None:
+                with self._connection:
+                    self._connection.executemany('INSERT OR REPLACE INTO maps (md5, map_id) VALUES (?, ?)', pairs)
+
+    def flush(self) -> None:
+        """
+        Writes the pairs learned from responses which are not saved yet.
+        """
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, []
+            self._saved = time.monotonic()
+        self._write(unsaved)
+
+    def load_mapsets(self, mapsets: Iterable[dict]) -> int:
+        """
+        Bulk loads the maps of synced mapsets, e.g. :attr:`MapsetIndex.mapsets`.
+
+        Parameters
+        ----------
+        mapsets: Iterable[dict]
+            The mapsets, or the responses of :meth:`MapsetsBasedRequests.get_mapset_data`.
+
+        Returns
+        -------
+        int
+            The amount of pairs which were not known yet.
+        """
+        return self.add_maps(beatmap for mapset in mapsets for beatmap in _iter_maps({'mapset': mapset.get('mapset', mapset)}))
+
+    def observe(self, route, response) -> None:
+        """
+        Adds the maps of a response, registered as an observer of the HTTPClient.
+
+        Only the responses of endpoints which contain maps are decoded. The new
+        pairs are written once ``FLUSH_SIZE`` of them or ``FLUSH_INTERVAL`` seconds
+        accumulated, in the default executor.
+        """
+        if route.endpoint is None or route.endpoint.name not in _MAP_ENDPOINTS:
+            return
+        new = self._remember(_map_pairs(_iter_maps(response.json())))
+        if self._connection is None:
+            return
+        with self._lock:
+            self._unsaved.extend(new)
+            due = len(self._unsaved) >= self.FLUSH_SIZE or (
+                self._unsaved and time.monotonic() - self._saved >= self.FLUSH_INTERVAL)
+            if due:
+                # keeps other responses from scheduling the same flush
+                self._saved = time.monotonic()
+        if due:
+            asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def close(self) -> None:
+        self.flush()
+        with self._write_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
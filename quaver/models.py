@@ -1,19 +1,49 @@
 import asyncio
+import contextlib
 import datetime
-from typing import Iterable, Optional, Union
-
-import multidict
+from typing import Dict, Iterable, List, Optional, Union
 
 from quaver.errors import InvalidArgumentPassed
 
 from .enums import GameMode, RankStatus
-from .http import Route
+from .endpoints import ENDPOINTS
+from .playlists import PlaylistIndex
 
 __all__ = ('UserBasedRequests', 'MapsetsBasedRequests', 'LeaderboardBasedRequests', 'PlaylistBasedRequest', 'MapBasedRequests', 'MultiplayerBasedRequests', 'MiscBasedRequest')
 
 class UserBasedRequests:
     
 
+    async def _resolve_user_id(self, _id: Union[int, str]) -> int:
+        """
+        Resolve the ID of a user.
+
+        Parameters
+        ----------
+        _id: Union[int, str]
+            The user's ID. If the username is passed, the ID will be fetched from the API.
+
+        Returns
+        -------
+        int
+            The user's ID.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        InvalidArgumentPassed
+            If the id is not an integer or a string.
+        """
+        if isinstance(_id, int):
+            return _id
+        elif isinstance(_id, str):
+            with self._client.raw_responses(False):
+                json = await self.get_users(_id)
+            return json['users'][0]['id']
+        raise InvalidArgumentPassed(
+            f'{_id} is not a valid argument for the id.')
+
     async def _get_full_user(self, name: Union[int, str]):
         """
         Get the full user.
@@ -33,8 +63,7 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        route = Route.create(f'/users/full/{name}', 'GET')
-        return await self._client.make_request(route)
+        return await self._client.make_request(ENDPOINTS['user_full'].route(name))
 
     async def get_users(self, name: Union[Union[str, int], Iterable[Union[str, int]]], *, full: Optional[bool] = False) -> dict:
         """
@@ -59,31 +88,23 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        if isinstance(name, str):
-            parameters = {'name': name}
+        if isinstance(name, (str, int)):
+            names = [name]
         elif isinstance(name, Iterable):
-            args = []
-            for username in name:
-                if isinstance(username, str):
-                    args.append(('name', username))
-                elif isinstance(username, int):
-                    args.append(('id', username))
-                else:
+            names = list(name)
+            for username in names:
+                if not isinstance(username, (str, int)):
                     raise InvalidArgumentPassed(
                         f'{username} is not a valid argument for the username.')
-            parameters = multidict.MultiDict(args)
-        elif isinstance(name, int):
-            parameters = {'id': name}
         else:
             raise InvalidArgumentPassed(
                 "The name argument must be a string, int or an iterable of strings or ints. Got, %s" % type(name).__name__)
         if full:
-            return await asyncio.gather(*[self._get_full_user(username) for username in parameters.values()])
-        else:
-            path = '/users'
-        return await self._client.make_request(
-            Route.create(path, 'GET', parameters)
-        )
+            return await asyncio.gather(*[self._get_full_user(username) for username in names])
+        return await self._client.make_request(ENDPOINTS['users'].route(
+            name=[username for username in names if isinstance(username, str)] or None,
+            id=[username for username in names if isinstance(username, int)] or None
+        ))
 
     async def search_user(self, name: str, *, fetch_full: Optional[bool] = False) -> dict:
         """
@@ -106,11 +127,10 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        route = Route.create(f'users/search/{name}', 'GET')
-        response = await self._client.make_request(route)
+        response = await self._client.make_request(ENDPOINTS['user_search'].route(name), raw=False if fetch_full else None)
         if fetch_full:
             usernames = [json['username'] for json in response['users']]
-            return await self.get_users(*usernames, full=True)
+            return await self.get_users(usernames, full=True)
         else:
             return response
 
@@ -139,19 +159,9 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        payload = {}
-        if isinstance(_id, int):
-            payload['id'] = _id
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            payload['id'] = json['users'][0]['id']
-        payload['page'] = int(paginate)
-        payload['limit'] = limit if limit <= 50 else 50
-        payload['mode'] = mode.value if isinstance(mode, GameMode) else (
-            mode if mode in range(1, 3) else GameMode.FOUR_KEYS.value)
-        return await self._client.make_request(
-            Route.create(f'/users/scores/best', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['user_best'].route(
+            id=await self._resolve_user_id(_id), page=paginate, limit=limit, mode=mode
+        ))
 
     async def get_user_recent(self, _id: Union[int, str], *, mode: int = GameMode.FOUR_KEYS.value, paginate: bool = False, limit: int = 50) -> dict:
         """
@@ -178,19 +188,9 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        payload = {}
-        if isinstance(_id, int):
-            payload['id'] = _id
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            payload['id'] = json['users'][0]['id']
-        payload['page'] = int(paginate)
-        payload['limit'] = limit if limit <= 50 else 50
-        payload['mode'] = mode.value if isinstance(mode, GameMode) else (
-            mode if mode in range(1, 3) else GameMode.FOUR_KEYS.value)
-        return await self._client.make_request(
-            Route.create(f'/users/scores/recent', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['user_recent'].route(
+            id=await self._resolve_user_id(_id), page=paginate, limit=limit, mode=mode
+        ))
 
     async def get_user_firstplace(self, _id: Union[int, str], *, mode: int = GameMode.FOUR_KEYS.value, paginate: bool = False, limit: int = 50) -> dict:
         """
@@ -220,22 +220,9 @@ class UserBasedRequests:
         InvalidArgumentPassed
             If the id is not an integer or a string.
         """
-        payload = {}
-        if isinstance(_id, int):
-            payload['id'] = _id
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            payload['id'] = json['users'][0]['id']
-        else:
-            raise InvalidArgumentPassed(
-                f'{_id} is not a valid argument for the id.')
-        payload['page'] = int(paginate)
-        payload['limit'] = limit if limit <= 50 else 50
-        payload['mode'] = mode.value if isinstance(mode, GameMode) else (
-            mode if mode in range(1, 3) else GameMode.FOUR_KEYS.value)
-        return await self._client.make_request(
-            Route.create(f'/users/scores/firstplace', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['user_firstplace'].route(
+            id=await self._resolve_user_id(_id), page=paginate, limit=limit, mode=mode
+        ))
 
     async def user_mapsets(self, _id: Union[str, int], *, mode=GameMode.FOUR_KEYS.value, status: Optional[int] = None, paginate: bool = False) -> dict:
         """
@@ -262,16 +249,9 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        payload = {}
-        payload['page'] = int(paginate)
-        if status:
-            payload['status'] = status.value if isinstance(status, RankStatus) else (
-                status if status in range(1, 3) else RankStatus.RANKED.value)
-        payload['mode'] = mode.value if isinstance(mode, GameMode) else (
-            mode if mode in range(1, 3) else GameMode.FOUR_KEYS.value)
-        return await self._client.make_request(
-            Route.create(f'/users/mapsets/{_id}', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['user_mapsets'].route(
+            _id, page=paginate, status=status or None, mode=mode
+        ))
 
     async def get_user_graph(self, _id: Union[str, int], *, mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value):
         """
@@ -294,59 +274,159 @@ class UserBasedRequests:
         APIDown
             If the API is down.
         """
-        payload = {}
-        if isinstance(_id, int):
-            payload['id'] = _id
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            payload['id'] = json['users'][0]['id']
-        else:
-            raise InvalidArgumentPassed(
-                f'{_id} is not a valid argument for the id.')
-        payload['mode'] = mode.value if isinstance(mode, GameMode) else (
-            mode if mode in range(1, 3) else GameMode.FOUR_KEYS.value)
-        return await self._client.make_request(
-            Route.create(f'/users/graph/rank', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['user_graph'].route(
+            id=await self._resolve_user_id(_id), mode=mode
+        ))
 
     async def get_user_playlist(self, _id: Union[str, int]):
-        if isinstance(_id, int):
-            pass
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            _id = json['users'][0]['id']
-        else:
-            raise InvalidArgumentPassed(
-                f'{_id} is not a valid argument for the id.')
-        return await self._client.make_request(
-            Route.create(f'/users/{_id}/playlists', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['user_playlists'].route(await self._resolve_user_id(_id)))
 
     async def check_song_in_user_playlist(self, _id: Union[str, int], map_id: int):
-        if isinstance(_id, int):
-            pass
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            _id = json['users'][0]['id']
-        else:
-            raise InvalidArgumentPassed(
-                f'{_id} is not a valid argument for the id.')
-        return await self._client.make_request(
-            Route.create(f'/users/{_id}/playlists/map/{map_id}', 'GET')
+        return await self._client.make_request(ENDPOINTS['user_playlist_map'].route(await self._resolve_user_id(_id), map_id))
+
+    async def get_user_playlist_index(self, _id: Union[str, int], *, ttl: float = 300.0, refresh: bool = False) -> PlaylistIndex:
+        """
+        Function to get an index of which playlists of a user contain which maps.
+
+        The playlists and their maps are fetched once and the index is reused
+        until it is older than ``ttl`` seconds.
+
+        Parameters
+        ----------
+        id: Union[str, int]
+            The user's ID. If the username is passed, the ID will be fetched from the API.
+        ttl: float
+            The amount of seconds to reuse the index for.
+        refresh: bool
+            Whether or not to rebuild the index from fresh responses even if it has not expired.
+
+        Returns
+        -------
+        PlaylistIndex
+            The index of the user's playlists.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        InvalidArgumentPassed
+            If the id is not an integer or a string.
+        """
+        index = None if refresh else self._playlist_indexes.get(_id, None)
+        if index is not None:
+            return index
+        user_id = await self._resolve_user_id(_id)
+        with self._client.raw_responses(False), (self._client.fresh_responses() if refresh else contextlib.nullcontext()):
+            playlists = await self.get_user_playlist(user_id)
+            maps = await asyncio.gather(*[self.get_playlist_maps(playlist['id']) for playlist in playlists.get('playlists', [])])
+        index = PlaylistIndex.from_responses(user_id, playlists, maps, ttl=ttl)
+        self._playlist_indexes.set(_id, index, ttl)
+        return index
+
+    async def check_songs_in_user_playlist(self, _id: Union[str, int], map_ids: Iterable[int], *, ttl: float = 300.0, refresh: bool = False) -> Dict[int, List[dict]]:
+        """
+        Function to check which playlists of a user contain each of many maps.
+
+        Unlike :meth:`check_song_in_user_playlist` this answers every map from
+        a single :meth:`get_user_playlist_index`, so the API is only hit when
+        the index is built or refreshed.
+
+        Parameters
+        ----------
+        id: Union[str, int]
+            The user's ID. If the username is passed, the ID will be fetched from the API.
+        map_ids: Iterable[int]
+            The ids of the maps to check.
+        ttl: float
+            The amount of seconds to reuse the index for.
+        refresh: bool
+            Whether or not to rebuild the index from fresh responses even if it has not expired.
+
+        Returns
+        -------
+        Dict[int, List[dict]]
+            A mapping of every map id to the playlists of the user containing it.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        InvalidArgumentPassed
+            If the id is not an integer or a string.
+        """
+        index = await self.get_user_playlist_index(_id, ttl=ttl, refresh=refresh)
+        return index.check(map_ids)
+
+    async def get_user_profile(
+        self,
+        _id: Union[str, int],
+        *,
+        parts: Iterable[str] = ('user', 'best', 'recent', 'graph', 'achievements', 'playlists'),
+        mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value,
+        timeout: Optional[float] = None
+    ) -> dict:
+        """
+        Function to get everything needed to render the profile of a user in one call.
+
+        The user's ID is resolved once and every requested part is fetched
+        concurrently. A part which fails or does not finish within ``timeout``
+        is left out of the result and its exception is put under ``errors``.
+
+        Parameters
+        ----------
+        id: Union[str, int]
+            The user's ID. If the username is passed, the ID will be fetched from the API.
+        parts: Iterable[str]
+            The parts to fetch, any of ``user``, ``best``, ``recent``, ``graph``,
+            ``achievements`` and ``playlists``.
+        mode: Union[GameMode, int]
+            The mode to get the scores and the graph for.
+        timeout: Optional[float]
+            The amount of seconds to wait for each part.
+
+        Returns
+        -------
+        dict
+            The ``id`` of the user, the response of every part which succeeded
+            keyed by its name and the ``errors`` of those which did not.
+
+        Raises
+        ------
+        APIDown
+            If the API is down while resolving the username.
+        InvalidArgumentPassed
+            If the id is not an integer or a string or a part is unknown.
+        """
+        _id = await self._resolve_user_id(_id)
+
+        fetchers = {
+            'user': lambda: self._get_full_user(_id),
+            'best': lambda: self.get_user_best(_id, mode=mode),
+            'recent': lambda: self.get_user_recent(_id, mode=mode),
+            'graph': lambda: self.get_user_graph(_id, mode=mode),
+            'achievements': lambda: self.get_user_achievements(_id),
+            'playlists': lambda: self.get_user_playlist(_id),
+        }
+        parts = list(parts)
+        for part in parts:
+            if part not in fetchers:
+                raise InvalidArgumentPassed(
+                    f'{part} is not a valid profile part.')
+
+        results = await asyncio.gather(
+            *[asyncio.wait_for(fetchers[part](), timeout) for part in parts],
+            return_exceptions=True
         )
+        profile = {'id': _id, 'errors': {}}
+        for part, result in zip(parts, results):
+            if isinstance(result, BaseException):
+                profile['errors'][part] = result
+            else:
+                profile[part] = result
+        return profile
 
     async def get_user_achievements(self, _id: Union[str, int]):
-        if isinstance(_id, int):
-            pass
-        elif isinstance(_id, str):
-            json = await self.get_users(_id)
-            _id = json['users'][0]['id']
-        else:
-            raise InvalidArgumentPassed(
-                f'{_id} is not a valid argument for the id.')
-        return await self._client.make_request(
-            Route.create(f'/users/{_id}/achievements', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['user_achievements'].route(await self._resolve_user_id(_id)))
 
 
 class MapsetsBasedRequests:
@@ -366,9 +446,7 @@ class MapsetsBasedRequests:
         APIDown
             If the API is down.
         """
-        return await self._client.make_request(
-            Route.create('/mapsets/ranked', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['mapsets_ranked'].route())
 
     async def get_mapsets_pending(self, *, paginate: bool = False, mode: Union[RankStatus, int] = RankStatus.RANKED.value) -> dict:
         """
@@ -384,21 +462,59 @@ class MapsetsBasedRequests:
         APIDown
             If the API is down.
         """
-        payload = {}
-        payload['page'] = int(paginate)
-        payload['mode'] = mode.value if isinstance(mode, RankStatus) else (
-            mode if mode in range(1, 3) else RankStatus.RANKED.value)
-        return await self._client.make_request(
-            Route.create('/mapsets/queue', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['mapsets_queue'].route(page=paginate, mode=mode))
 
     async def get_mapset_data(self, ids: Union[int, list[int]]):
+        endpoint = ENDPOINTS['mapset']
         if isinstance(ids, int):
-            return await self._client.make_request(
-                Route.create(f'/mapsets/{ids}', 'GET')
-            )
-        routes = [Route.create(f'/mapsets/{id}', 'GET') for id in ids]
-        return await asyncio.gather(*[self._client.make_request(route) for route in routes])
+            return await self._client.make_request(endpoint.route(ids))
+        return await asyncio.gather(*[self._client.make_request(endpoint.route(id)) for id in ids])
+
+    async def build_mapset_index(self, ids: Optional[Iterable[int]] = None, *, concurrency: int = 8):
+        """
+        Function to build a local index which answers :meth:`search_mapset` queries offline.
+
+        Requires NumPy, which can be installed with ``pip install quaver.py[numpy]``.
+
+        Parameters
+        ----------
+        ids: Optional[Iterable[int]]
+            The ids of the mapsets to index. Defaults to all the ranked mapsets.
+        concurrency: int
+            The maximum amount of mapsets fetched at once.
+
+        Returns
+        -------
+        MapsetIndex
+            The index of the fetched mapsets, the mapsets which could not be
+            fetched are skipped and listed in :attr:`MapsetIndex.failed`.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        """
+        from .search import MapsetIndex
+
+        index = MapsetIndex()
+        endpoint = ENDPOINTS['mapset']
+
+        async def worker(pending: Iterable[int]) -> None:
+            # the workers share one iterator, every mapset is added as soon as it arrives
+            for mapset_id in pending:
+                try:
+                    response = await self._client.make_request(endpoint.route(mapset_id))
+                except Exception as error:
+                    index.failed[mapset_id] = error
+                else:
+                    index.add_mapset(response)
+
+        with self._client.raw_responses(False):
+            if ids is None:
+                ids = (await self.get_ranked_maps())['mapsets']
+            pending = iter(list(ids))
+            await asyncio.gather(*[worker(pending) for _ in range(concurrency)])
+        return index
 
     async def search_mapset(
         self,
@@ -419,80 +535,93 @@ class MapsetsBasedRequests:
         mindate: Optional[datetime.datetime],
         maxdate: Optional[datetime.datetime]
     ):
-        payload = {}
-
-        payload['search'] = search
-
-        if isinstance(mode, GameMode):
-            mode = mode.value
-        if isinstance(status, RankStatus):
-            status = status.value
-        payload['mode'] = int(mode)
-        payload['status'] = int(status)
-        payload['page'] = int(pagination)
-        payload['limit'] = int(limit)
-
-        if mindiff is not None:
-            payload['mindiff'] = int(mindiff)
-        if maxdiff is not None:
-            payload['maxdiff'] = int(maxdiff)
-        if minbpm is not None:
-            payload['minbpm'] = int(minbpm)
-        if maxbpm is not None:
-            payload['maxbpm'] = int(maxbpm)
-
-        if minlns is not None:
-            payload['minlns'] = int(minlns)
-        if maxlns is not None:
-            payload['maxlns'] = int(maxlns)
-
-        if minplaycount is not None:
-            payload['minplaycount'] = int(minplaycount)
-        if maxplaycount is not None:
-            payload['maxplaycount'] = int(maxplaycount)
-
-        if mindate is not None:
-            payload['mindate'] = int(mindate.timestamp())
-        if maxdate is not None:
-            payload['maxdate'] = int(maxdate.timestamp())
-
-        return await self._client.make_request(
-            Route.create('/mapsets/maps/search', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['mapset_search'].route(
+            search=search, mode=mode, status=status, page=pagination, limit=limit,
+            mindiff=mindiff, maxdiff=maxdiff, minbpm=minbpm, maxbpm=maxbpm,
+            minlns=minlns, maxlns=maxlns, minplaycount=minplaycount, maxplaycount=maxplaycount,
+            mindate=mindate, maxdate=maxdate
+        ))
 
     async def get_map_comments(self, map_id: int):
-        return await self._client.make_request(
-            Route.create(f'/mapsets/{map_id}/comments', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['mapset_comments'].route(map_id))
 
 
 class MapBasedRequests:
 
+    def _cache_map_by_id(self, route, response) -> None:
+        # registered as an observer when caching, stores a map requested by
+        # its md5 hash under its id as well so both forms share the entry
+        endpoint = ENDPOINTS['map']
+        if route.endpoint is not endpoint or route.path.strip('/').split('/')[-1].isdigit():
+            return
+        try:
+            map_id = response.json()['map']['id']
+        except (ValueError, KeyError, TypeError):
+            return
+        self._client.cache.set(endpoint.route(map_id).cache_key, response, endpoint.ttl)
+
+    async def resolve_map_id(self, map_id: Union[int, str]) -> int:
+        """
+        Function to get the id of a map from its md5 hash.
+
+        The md5 hash is looked up in the client's ``map_index`` first and
+        only fetched from the API when it is unknown.
+
+        Parameters
+        ----------
+        map_id: Union[int, str]
+            The md5 hash of the map. Ids are returned as is.
+
+        Returns
+        -------
+        int
+            The id of the map.
+
+        Raises
+        ------
+        APIDown
+            If the API is down.
+        """
+        if isinstance(map_id, int):
+            return map_id
+        if len(map_id) != 32 and map_id.isdigit():
+            return int(map_id)
+        if self._map_index is not None:
+            known = self._map_index.get_id(map_id)
+            if known is not None:
+                return known
+        with self._client.raw_responses(False):
+            return (await self.get_map(map_id))['map']['id']
+
     async def get_map(self, map_id: Union[int, str]):
         """
         Function to get a map by its id.
 
+        When the client has a ``map_index`` which knows the md5 hash, the map
+        is requested by its id. A map requested by an unknown md5 hash is
+        cached under its id as well, so both forms share their cache entries.
+
         Parameters
         ----------
         map_id: Union[int, str]
             The id of the map to get or the md5 hash of the map.
         """
-        return await self._client.make_request(
-            Route.create(f'/maps/{map_id}/', 'GET')
-        )
+        if isinstance(map_id, str) and self._map_index is not None:
+            known = self._map_index.get_id(map_id)
+            if known is not None:
+                map_id = known
+        return await self._client.make_request(ENDPOINTS['map'].route(map_id))
 
-    async def get_map_scores(self, map_id: int):
+    async def get_map_scores(self, map_id: Union[int, str]):
         """
         Function to get scores of a map.
 
         Parameters
         ----------
-        map_id: int
-            The id of the map to get scores of.
+        map_id: Union[int, str]
+            The id of the map to get scores of or the md5 hash of the map.
         """
-        return await self._client.make_request(
-            Route.create(f'/scores/map/{map_id}/', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['map_scores'].route(await self.resolve_map_id(map_id)))
 
     async def get_hit_graph(self, score_id: int):
         """
@@ -503,9 +632,7 @@ class MapBasedRequests:
         score_id: int
             The id of the score to get the hit graph of.
         """
-        return await self._client.make_request(
-            Route.create(f'/scores/data/{score_id}', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['score_data'].route(score_id))
 
 
 class LeaderboardBasedRequests:
@@ -522,24 +649,15 @@ class LeaderboardBasedRequests:
         pagination: bool
             Whether or not to paginate the leaderboard.
         """
-        payload = {}
-        payload['mode'] = int(mode)
-        payload['page'] = int(pagination)
-        if country:
-            payload['country'] = country
-        return await self._client.make_request(
-            Route.create('/leaderboards', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['leaderboard'].route(
+            mode=mode, page=pagination, country=country or None
+        ))
 
     async def get_leaderboard_hits(self, pagination: bool = False):
         """
         Function to get the leaderboard hits.
         """
-        payload = {}
-        payload['page'] = int(pagination)
-        return await self._client.make_request(
-            Route.create('/leaderboards/hits', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['leaderboard_hits'].route(page=pagination))
 
 
 class PlaylistBasedRequest:
@@ -554,9 +672,7 @@ class PlaylistBasedRequest:
         playlist_id: int
             The id of the playlist to get.
         """
-        return await self._client.make_request(
-            Route.create(f'/playlists/{playlist_id}', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['playlist'].route(playlist_id))
 
     async def get_playlist_maps(self, playlist_id: int):
         """
@@ -567,9 +683,7 @@ class PlaylistBasedRequest:
         playlist_id: int
             The id of the playlist to get maps of.
         """
-        return await self._client.make_request(
-            Route.create(f'/playlists/{playlist_id}/maps', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['playlist_maps'].route(playlist_id))
 
     async def search_playlist(self, search: str, *, paginate: bool = False):
         """
@@ -582,13 +696,9 @@ class PlaylistBasedRequest:
         paginate: bool
             Whether or not to paginate the search.
         """
-        payload = {}
-        payload['search'] = search
-        if paginate:
-            payload['page'] = int(paginate)
-        return await self._client.make_request(
-            Route.create('/playlists/all/search', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['playlist_search'].route(
+            search=search, page=paginate or None
+        ))
 
 
 class MultiplayerBasedRequests:
@@ -603,9 +713,7 @@ class MultiplayerBasedRequests:
         paginate: bool
             Whether or not to paginate the rooms.
         """
-        return await self._client.make_request(
-            Route.create('/multiplayer/games', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['multiplayer_games'].route())
 
     async def get_multiplayer_room(self, room_id: int):
         """
@@ -616,9 +724,7 @@ class MultiplayerBasedRequests:
         room_id: int
             The id of the room to get.
         """
-        return await self._client.make_request(
-            Route.create(f'/multiplayer/games/{room_id}', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['multiplayer_game'].route(room_id))
 
     async def get_multiplayer_room_members(self, room_id: int):
         """
@@ -629,9 +735,7 @@ class MultiplayerBasedRequests:
         room_id: int
             The id of the room to get the members of.
         """
-        return await self._client.make_request(
-            Route.create(f'/multiplayer/games/{room_id}/live', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['multiplayer_game_live'].route(room_id))
 
     async def get_multiplayer_leaderboard(self, *, paginate: bool = False, mode: Union[GameMode, int] = GameMode.FOUR_KEYS.value):
         """
@@ -642,12 +746,7 @@ class MultiplayerBasedRequests:
         room_id: int
             The id of the room to get the leaderboard of.
         """
-        payload = {}
-        payload['mode'] = int(mode)
-        payload['page'] = int(paginate)
-        return await self._client.make_request(
-            Route.create(f'/multiplayer/leaderboard', 'GET', payload)
-        )
+        return await self._client.make_request(ENDPOINTS['multiplayer_leaderboard'].route(mode=mode, page=paginate))
 
     async def get_one_match(self, match_id: int):
         """
@@ -658,9 +757,7 @@ class MultiplayerBasedRequests:
         match_id: int
             The id of the match to get.
         """
-        return await self._client.make_request(
-            Route.create(f'/multiplayer/match/{match_id}', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['multiplayer_match'].route(match_id))
 
 
 class MiscBasedRequest:
@@ -675,22 +772,16 @@ class MiscBasedRequest:
         team_id: int
             The id of the team to get.
         """
-        return await self._client.make_request(
-            Route.create(f'/team', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['team'].route())
 
     async def get_server_stats(self):
         """
         Function to get the server stats.
         """
-        return await self._client.make_request(
-            Route.create(f'/stats', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['stats'].route())
 
     async def get_country_stats(self):
         """
         Function to get the country stats.
         """
-        return await self._client.make_request(
-            Route.create(f'/stats/country', 'GET')
-        )
+        return await self._client.make_request(ENDPOINTS['stats_country'].route())
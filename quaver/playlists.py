@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List
+
+__all__ = ('PlaylistIndex',)
+
+
+def _map_ids(response: dict) -> List[int]:
+    maps = response.get('maps')
+    if maps is None:
+        maps = response.get('playlist', {}).get('maps', [])
+    return [beatmap['id'] if isinstance(beatmap, dict) else int(beatmap) for beatmap in maps]
+
+
+class PlaylistIndex:
+    """
+    An in-memory index of which of a user's playlists contain which maps.
+
+    Attributes
+    ----------
+    user_id: int
+        The id of the user the playlists belong to.
+    playlists: List[dict]
+        The playlists of the user as returned by :meth:`UserBasedRequests.get_user_playlist`.
+    ttl: float
+        The amount of seconds after which the index should be rebuilt.
+    created_at: float
+        The monotonic time at which the index was built.
+    """
+
+    __slots__ = ('user_id', 'playlists', 'ttl', 'created_at', '_maps')
+
+    def __init__(self, user_id: int, playlists: List[dict], maps: Dict[int, List[int]], *, ttl: float) -> None:
+        self.user_id: int = user_id
+        self.playlists: List[dict] = playlists
+        self.ttl: float = ttl
+        self.created_at: float = time.monotonic()
+        self._maps: Dict[int, List[dict]] = {}
+        by_id = {playlist['id']: playlist for playlist in playlists}
+        for playlist_id, map_ids in maps.items():
+            for map_id in map_ids:
+                self._maps.setdefault(map_id, []).append(by_id[playlist_id])
+
+    @classmethod
+    def from_responses(cls, user_id: int, playlists: dict, maps: Iterable[dict], *, ttl: float) -> PlaylistIndex:
+        """
+        Creates an index from the responses of the API.
+
+        Parameters
+        ----------
+        user_id: int
+            The id of the user.
+        playlists: dict
+            The response of :meth:`UserBasedRequests.get_user_playlist`.
+        maps: Iterable[dict]
+            The responses of :meth:`PlaylistBasedRequest.get_playlist_maps`, in the same order as the playlists.
+        ttl: float
+            The amount of seconds after which the index should be rebuilt.
+        """
+        playlists = playlists.get('playlists', [])
+        return cls(user_id, playlists, {
+            playlist['id']: _map_ids(response) for playlist, response in zip(playlists, maps)
+        }, ttl=ttl)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the index is older than its ttl."""
+        return time.monotonic() - self.created_at >= self.ttl
+
+    def __contains__(self, map_id: int) -> bool:
+        return map_id in self._maps
+
+    def playlists_for(self, map_id: int) -> List[dict]:
+        """
+        Returns the playlists of the user which contain a map.
+
+        Parameters
+        ----------
+        map_id: int
+            The id of the map.
+
+        Returns
+        -------
+        List[dict]
+            The playlists containing the map, empty if there are none.
+        """
+        return self._maps.get(map_id, [])
+
+    def check(self, map_ids: Iterable[int]) -> Dict[int, List[dict]]:
+        """
+        Returns the playlists of the user which contain each of the maps.
+
+        Parameters
+        ----------
+        map_ids: Iterable[int]
+            The ids of the maps.
+
+        Returns
+        -------
+        Dict[int, List[dict]]
+            A mapping of every map id to the playlists containing it.
+        """
+        return {map_id: self.playlists_for(map_id) for map_id in map_ids}
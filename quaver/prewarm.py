@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import multidict
+
+from .endpoints import ENDPOINTS
+from .enums import GameMode
+from .http import Route
+from .stats import AccessStats
+
+__all__ = ('Manifest', 'prewarm')
+
+
+class Manifest:
+    """
+    A list of hot resources to fetch ahead of time with :meth:`Quaver.prewarm`.
+
+    Every entry is an endpoint name, a path and the query parameters of a
+    request, so replaying it fills the exact cache entry later calls use.
+
+    Attributes
+    ----------
+    entries: List[Tuple[str, str, List[Tuple[str, Any]]]]
+        The ``(endpoint, path, params)`` of every resource, hottest first.
+    """
+
+    __slots__ = ('entries',)
+
+    def __init__(self, entries: Optional[List[Tuple[str, str, List[Tuple[str, Any]]]]] = None) -> None:
+        self.entries: List[Tuple[str, str, List[Tuple[str, Any]]]] = entries or []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add(self, route: Route) -> None:
+        entry = (route.endpoint.name, route.path, list(route.params.items()) if route.params else [])
+        if entry not in self.entries:
+            self.entries.append(entry)
+
+    @classmethod
+    def default(cls, *, leaderboard_pages: int = 5, modes: Tuple[Union[GameMode, int], ...] = (GameMode.FOUR_KEYS, GameMode.SEVEN_KEYS)) -> Manifest:
+        """
+        Creates a manifest of the resources every client is likely to need:
+        the first leaderboard pages of every mode, the ranked mapsets, the team
+        and the server stats.
+
+        Parameters
+        ----------
+        leaderboard_pages: int
+            The amount of leaderboard pages to fetch per mode.
+        modes: Tuple[Union[GameMode, int], ...]
+            The modes to fetch the leaderboards of.
+        """
+        manifest = cls()
+        for mode in modes:
+            for page in range(leaderboard_pages):
+                manifest._add(ENDPOINTS['leaderboard'].route(mode=mode, page=page))
+        for name in ('mapsets_ranked', 'team', 'stats'):
+            manifest._add(ENDPOINTS[name].route())
+        return manifest
+
+    @classmethod
+    def from_stats(cls, stats: AccessStats, *, top: int = 200, base: Optional[Manifest] = None) -> Manifest:
+        """
+        Creates a manifest of the most requested resources.
+
+        Parameters
+        ----------
+        stats: AccessStats
+            The access statistics of a client, see :attr:`HTTPClient.stats`.
+        top: int
+            The amount of resources to take from the statistics.
+        base: Optional[Manifest]
+            A manifest whose entries come first, defaults to :meth:`default`.
+        """
+        manifest = cls(list((base if base is not None else cls.default()).entries))
+        for (name, path, params), _ in stats.most_common(top):
+            entry = (name, path, list(params))
+            if entry not in manifest.entries:
+                manifest.entries.append(entry)
+        return manifest
+
+    def merge(self, other: Manifest, *, limit: Optional[int] = None) -> Manifest:
+        """
+        Creates a manifest of the entries of this one followed by the entries of
+        ``other`` which are not in it, e.g. to keep the hot resources of previous runs.
+
+        Parameters
+        ----------
+        other: Manifest
+            The manifest whose entries come last.
+        limit: Optional[int]
+            The maximum amount of entries, None for no limit.
+        """
+        manifest = Manifest(list(self.entries))
+        for entry in other.entries:
+            if limit is not None and len(manifest.entries) >= limit:
+                break
+            if entry not in manifest.entries:
+                manifest.entries.append(entry)
+        return manifest
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> Manifest:
+        """
+        Loads a manifest saved with :meth:`save`.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        return cls([(name, route_path, [tuple(item) for item in params]) for name, route_path, params in data['entries']])
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Saves the manifest as JSON, atomically replacing the file at ``path``.
+        """
+        path = os.fspath(path)
+        # a unique temporary file, so concurrent saves never write to the same one
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False) as f:
+            json.dump({'entries': self.entries}, f)
+        os.replace(f.name, path)
+
+    def routes(self) -> List[Route]:
+        """
+        Returns the routes of the entries whose endpoint still exists.
+        """
+        routes = []
+        for name, path, params in self.entries:
+            endpoint = ENDPOINTS.get(name)
+            if endpoint is None:
+                continue
+            keys = [key for key, _ in params]
+            payload = (multidict.MultiDict(params) if len(keys) != len(set(keys)) else dict(params)) or None
+            routes.append(Route(Route.BASE_URL + path, endpoint.method, payload, path, endpoint.key, endpoint))
+        return routes
+
+
+async def prewarm(client, manifest: Manifest, *, concurrency: int = 4, progress: Optional[Callable[[int, int, int], Any]] = None) -> Tuple[int, int]:
+    """
+    Fetches every resource of a manifest with bounded concurrency.
+
+    Parameters
+    ----------
+    client: HTTPClient
+        The client to fetch the resources with.
+    manifest: Manifest
+        The resources to fetch.
+    concurrency: int
+        The maximum amount of resources fetched at once.
+    progress: Optional[Callable[[int, int, int], Any]]
+        Called with the amount of fetched, failed and total resources after every resource.
+
+    Returns
+    -------
+    Tuple[int, int]
+        The amount of fetched and failed resources.
+    """
+    routes = manifest.routes()
+    semaphore = asyncio.Semaphore(concurrency)
+    counts: Dict[str, int] = {'done': 0, 'failed': 0}
+
+    async def fetch(route: Route) -> None:
+        async with semaphore:
+            try:
+                await client.make_request(route, record=False)
+            except Exception:
+                counts['failed'] += 1
+            else:
+                counts['done'] += 1
+        if progress is not None:
+            progress(counts['done'], counts['failed'], len(routes))
+
+    await asyncio.gather(*[fetch(route) for route in routes])
+    return counts['done'], counts['failed']
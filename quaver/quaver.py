@@ -1,8 +1,15 @@
-from typing import Optional
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Optional, Dict, Hashable, Union
 
 import aiohttp
 
+from .cache import TTLCache
+from .enums import Priority
 from .http import HTTPClient
+from .mapindex import MapIdIndex
+from .prewarm import Manifest, prewarm
 from .models import (LeaderboardBasedRequests, MapBasedRequests,
                      MapsetsBasedRequests, MiscBasedRequest,
                      MultiplayerBasedRequests, PlaylistBasedRequest,
@@ -17,16 +24,63 @@ class Quaver (
         MapBasedRequests, MultiplayerBasedRequests,
         MiscBasedRequest
 ):
-    __slots__ = ('_client',)
+    __slots__ = ('_client', '_playlist_indexes', '_map_index', '_manifest_path', '_manifest_lock')
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        *,
+        timeout: Optional[float] = None,
+        route_timeouts: Optional[Dict[str, float]] = None,
+        hedge: bool = False,
+        cache_size: int = 0,
+        rate_limit: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        tenant_weights: Optional[Dict[Hashable, float]] = None,
+        map_index: Optional[Union[str, os.PathLike, MapIdIndex]] = None,
+        manifest_path: Optional[Union[str, os.PathLike]] = None,
+        raw: bool = False,
+        base_url: Optional[str] = None
+    ):
         """
         The class for the Quaver API.
 
         Parameters
         ----------
         session: Optional[aiohttp.ClientSession]
-            The session to use for the HTTPClient to send requests to the API.
+            The session to use for the HTTPClient to send requests to the API. The client
+            may be shared by event loops running in several threads, every other loop gets
+            its own session while the cache, rate limit and map index are shared.
+        timeout: Optional[float]
+            The default amount of seconds to wait for a request.
+        route_timeouts: Optional[Dict[str, float]]
+            Timeouts overriding the default one for the paths starting with each key, e.g. ``{'/mapsets': 5.0}``.
+        hedge: bool
+            Whether or not to send a duplicate of a request which has not
+            answered within the observed 95th percentile latency of its route.
+        cache_size: int
+            The amount of responses to cache for the ttl declared by their endpoint,
+            0 to disable caching. Cached responses are shared and must not be mutated.
+        rate_limit: Optional[float]
+            The amount of rate limit tokens to spend per second, every request costs
+            the ``cost`` declared by its endpoint.
+        max_concurrency: Optional[int]
+            The maximum amount of requests in flight. Once reached, waiting requests
+            are sent by priority class and shared fairly between tenants, see :meth:`priority`.
+        tenant_weights: Optional[Dict[Hashable, float]]
+            The share of every tenant within a priority class, 1 for tenants not in it.
+        map_index: Optional[Union[str, os.PathLike, MapIdIndex]]
+            The md5 to map id index, or the path of its database, to fill from every
+            map and mapset response and to resolve md5 hashes locally with.
+        manifest_path: Optional[Union[str, os.PathLike]]
+            Where to save the prewarm manifest generated from the access statistics
+            of this run when the client is closed, and to load it from in :meth:`prewarm`.
+        raw: bool
+            Whether or not to return the undecoded body of every response as bytes
+            instead of decoding its JSON, see :meth:`raw_responses`.
+        base_url: Optional[str]
+            The base url to send requests to instead of the public API, e.g. the one
+            of a proxy started with ``python -m quaver serve``: ``http://127.0.0.1:8080/v1``.
 
         Raises
         ------
@@ -37,13 +91,159 @@ class Quaver (
         ----------
         _client: HTTPClient
             The HTTPClient to use for sending requests to the API.
+        _playlist_indexes: TTLCache
+            The playlist indexes built by :meth:`get_user_playlist_index`, the
+            1024 most recently used ones are kept until they expire.
+        _map_index: Optional[MapIdIndex]
+            The md5 to map id index, if any.
+        _manifest_path: Optional[Union[str, os.PathLike]]
+            The path of the prewarm manifest, if any.
+        _manifest_lock: threading.Lock
+            Serializes the saves of the manifest by the event loops closing the client.
         """
-        self._client = HTTPClient(session)
+        self._client = HTTPClient(
+            session, timeout=timeout, route_timeouts=route_timeouts, hedge=hedge,
+            cache_size=cache_size, rate_limit=rate_limit,
+            max_concurrency=max_concurrency, tenant_weights=tenant_weights, raw=raw,
+            base_url=base_url
+        )
+        self._playlist_indexes = TTLCache(1024)
+        self._map_index = map_index if isinstance(map_index, MapIdIndex) or map_index is None else MapIdIndex(map_index)
+        if self._map_index is not None:
+            self._client.observers.append(self._map_index.observe)
+        if self._client.cache is not None:
+            self._client.observers.append(self._cache_map_by_id)
+        self._manifest_path = manifest_path
+        self._manifest_lock = threading.Lock()
+
+    def deadline(self, seconds: float):
+        """
+        Context manager bounding every request made within it to finish within ``seconds``.
+
+        The deadline applies to everything a call fans out into, e.g. every
+        full user fetched by ``get_users(..., full=True)``.
+
+        Raises
+        ------
+        RequestTimeout
+            If the deadline is exceeded.
+        """
+        return self._client.deadline(seconds)
+
+    def raw_responses(self, enabled: bool = True):
+        """
+        Context manager making every request within it return the undecoded body
+        of the response as bytes, or the decoded JSON when not ``enabled``.
+
+        Raw bodies are served straight from the cache and only decoded when a
+        decoded response is requested, which is useful to proxy responses as is.
+
+        Parameters
+        ----------
+        enabled: bool
+            Whether or not to return raw bodies.
+        """
+        return self._client.raw_responses(enabled)
+
+    def fresh_responses(self):
+        """
+        Context manager making every request within it skip the cached responses
+        and fetch them from the API. The fetched responses still refresh the cache.
+        """
+        return self._client.fresh_responses()
+
+    def priority(self, priority: Priority, tenant: Hashable = None):
+        """
+        Context manager scheduling every request made within it with a priority class and tenant.
+
+        Only has an effect when ``max_concurrency`` is set.
+
+        Parameters
+        ----------
+        priority: Priority
+            The priority class, e.g. ``Priority.INTERACTIVE`` for bot commands
+            and ``Priority.BACKGROUND`` for crawls.
+        tenant: Hashable
+            The key to share capacity fairly by, e.g. the id of a Discord guild.
+        """
+        return self._client.priority(priority, tenant)
+
+    def prewarm(
+        self,
+        manifest: Optional[Union[Manifest, str, os.PathLike]] = None,
+        *,
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, int, int], Any]] = None
+    ) -> asyncio.Task:
+        """
+        Fetches the hot resources of a manifest in the background with ``Priority.BACKGROUND``.
+
+        Only fills the cache when ``cache_size`` is set, otherwise it still
+        opens the connections.
+
+        Parameters
+        ----------
+        manifest: Optional[Union[Manifest, str, os.PathLike]]
+            The manifest or the path of a saved one. Defaults to the one saved at
+            ``manifest_path`` by the previous run, or :meth:`Manifest.default`.
+        concurrency: int
+            The maximum amount of resources fetched at once.
+        progress: Optional[Callable[[int, int, int], Any]]
+            Called with the amount of fetched, failed and total resources after every resource.
+
+        Returns
+        -------
+        asyncio.Task
+            The task fetching the resources, resolving to the amount of fetched and failed resources.
+        """
+        if manifest is None and self._manifest_path is not None and os.path.exists(self._manifest_path):
+            manifest = self._manifest_path
+        if manifest is None:
+            manifest = Manifest.default()
+        elif not isinstance(manifest, Manifest):
+            manifest = Manifest.load(manifest)
+        with self.priority(Priority.BACKGROUND):
+            return asyncio.ensure_future(prewarm(self._client, manifest, concurrency=concurrency, progress=progress))
+
+    def save_manifest(self, path: Union[str, os.PathLike], *, top: int = 200, merge: bool = True) -> Manifest:
+        """
+        Saves a prewarm manifest of the resources most requested through this client.
+
+        Parameters
+        ----------
+        path: Union[str, os.PathLike]
+            The path to save the manifest at.
+        top: int
+            The amount of most requested resources to include besides :meth:`Manifest.default`.
+        merge: bool
+            Whether or not to fill the manifest up to that size with the entries of the
+            manifest already saved at ``path``, so a short run keeps the hot resources of
+            the previous ones.
+
+        Returns
+        -------
+        Manifest
+            The saved manifest.
+        """
+        with self._manifest_lock:
+            manifest = Manifest.from_stats(self._client.stats, top=top)
+            if merge and os.path.exists(path):
+                manifest = manifest.merge(Manifest.load(path), limit=len(Manifest.default()) + top)
+            manifest.save(path)
+        return manifest
 
     async def close(self) -> None:
         """
-        Closes the HTTPClient.
+        Closes the session of the running event loop, saving the prewarm manifest when ``manifest_path``
+        is set and the pairs of the ``map_index`` which are not written yet.
+
+        Every event loop which used the client has to close it before it stops.
         """
+        # prewarm requests are not counted, a run which made no other one has nothing to add
+        if self._manifest_path is not None and len(self._client.stats):
+            self.save_manifest(self._manifest_path)
+        if self._map_index is not None:
+            self._map_index.flush()
         await self._client.close()
 
     async def __aenter__(self):
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .enums import Priority
+
+__all__ = ('RequestScheduler',)
+
+
+class RequestScheduler:
+    """
+    Limits the amount of requests in flight and decides which waiting request is sent next.
+
+    Waiting requests of a higher priority class are always sent first.
+    Within a class, tenants share the capacity in proportion to their
+    weight using start-time fair queuing, so a tenant queueing thousands of
+    requests only delays the others by its fair share.
+
+    Attributes
+    ----------
+    concurrency: int
+        The maximum amount of requests in flight.
+    weights: Dict[Hashable, float]
+        The weight of every tenant, tenants which are not in it have a weight of 1.
+    """
+
+    __slots__ = ('concurrency', 'weights', '_active', '_queues', '_finish', '_virtual', '_counter')
+
+    def __init__(self, concurrency: int, weights: Optional[Dict[Hashable, float]] = None) -> None:
+        self.concurrency: int = concurrency
+        self.weights: Dict[Hashable, float] = weights or {}
+        self._active: int = 0
+        self._queues: Dict[Priority, List[Tuple[float, int, asyncio.Future]]] = {priority: [] for priority in Priority}
+        self._finish: Dict[Hashable, float] = {}
+        self._virtual: float = 0.0
+        self._counter = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """The amount of requests waiting for a slot."""
+        return sum(not future.done() for queue in self._queues.values() for _, _, future in queue)
+
+    async def acquire(self, priority: Priority = Priority.DEFAULT, tenant: Hashable = None, cost: float = 1) -> None:
+        """
+        Waits until the request may be sent, :meth:`release` must be called once it is done.
+
+        Parameters
+        ----------
+        priority: Priority
+            The priority class of the request.
+        tenant: Hashable
+            The key of the tenant the request is made for, e.g. the id of a Discord guild.
+        cost: float
+            The cost of the request, charged to the tenant's share.
+        """
+        if self._active < self.concurrency and not any(self._queues.values()):
+            self._active += 1
+            return
+
+        start = max(self._virtual, self._finish.get(tenant, 0.0))
+        self._finish[tenant] = start + cost / self.weights.get(tenant, 1.0)
+        if len(self._finish) > 1024:
+            self._finish = {key: finish for key, finish in self._finish.items() if finish > self._virtual}
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queues[priority], (start, next(self._counter), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """
+        Frees the slot of a finished request and hands it to the next waiting one.
+        """
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._active < self.concurrency:
+                start, _, future = heapq.heappop(queue)
+                if future.done():
+                    continue
+                self._virtual = start
+                self._active += 1
+                future.set_result(None)
+            if self._active >= self.concurrency:
+                return
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+import itertools
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .enums import GameMode, RankStatus
+from .utils import to_timestamp
+
+__all__ = ('MapsetIndex',)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class MapsetIndex:
+    """
+    A local, columnar index of mapsets which answers the same queries as
+    :meth:`MapsetsBasedRequests.search_mapset` without touching the API.
+
+    Every map is stored as one row across a set of NumPy columns so that
+    the range filters are evaluated as vectorized comparisons, and the
+    title and artist of every mapset are kept in a prefix searchable
+    inverted index.
+
+    Attributes
+    ----------
+    mapsets: List[dict]
+        The mapsets that have been added to the index, in insertion order.
+    failed: Dict[int, Exception]
+        The ids of the mapsets :meth:`MapsetsBasedRequests.build_mapset_index`
+        could not fetch, mapped to their error.
+    """
+
+    __slots__ = (
+        'mapsets', 'failed', '_ids', '_columns', '_frozen',
+        '_map_id', '_mapset_row', '_mode', '_status', '_diff', '_bpm',
+        '_lns', '_playcount', '_date', '_vocabulary', '_postings',
+        '_offsets', '_posting_rows', '_order', '_map_rank'
+    )
+
+    _FIELDS = ('map_id', 'mapset_row', 'mode', 'status', 'diff', 'bpm', 'lns', 'playcount', 'date')
+    _DTYPES = (np.int64, np.int32, np.int8, np.int8, np.float32, np.float32, np.float32, np.int64, np.int64)
+
+    def __init__(self) -> None:
+        self.mapsets: List[dict] = []
+        self.failed: Dict[int, Exception] = {}
+        self._ids: dict = {}
+        self._columns: dict = {field: [] for field in self._FIELDS}
+        self._frozen: bool = False
+        self._vocabulary: List[str] = []
+        self._postings: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.mapsets)
+
+    @classmethod
+    def from_mapsets(cls, mapsets: Iterable[dict]) -> MapsetIndex:
+        """
+        Creates an index from an iterable of mapsets.
+
+        Parameters
+        ----------
+        mapsets: Iterable[dict]
+            The mapsets, or the responses of :meth:`MapsetsBasedRequests.get_mapset_data`.
+
+        Returns
+        -------
+        MapsetIndex
+            The populated index.
+        """
+        index = cls()
+        for mapset in mapsets:
+            index.add_mapset(mapset)
+        return index
+
+    def add_mapset(self, mapset: dict) -> None:
+        """
+        Adds a mapset and all of its maps to the index.
+
+        Mapsets which are already indexed are skipped, rebuild the index to
+        pick up changes to a mapset.
+
+        Parameters
+        ----------
+        mapset: dict
+            The mapset, or the response of :meth:`MapsetsBasedRequests.get_mapset_data`.
+        """
+        mapset = mapset.get('mapset', mapset)
+        if mapset['id'] in self._ids:
+            return
+        row = len(self.mapsets)
+        self._ids[mapset['id']] = row
+        self.mapsets.append(mapset)
+
+        columns = self._columns
+        for beatmap in mapset.get('maps', ()):
+            normal = beatmap.get('count_hitobject_normal', 0)
+            long = beatmap.get('count_hitobject_long', 0)
+            columns['map_id'].append(beatmap['id'])
+            columns['mapset_row'].append(row)
+            columns['mode'].append(beatmap.get('game_mode', 0))
+            columns['status'].append(beatmap.get('ranked_status', 0))
+            columns['diff'].append(beatmap.get('difficulty_rating', 0.0))
+            columns['bpm'].append(beatmap.get('bpm', 0.0))
+            columns['lns'].append(long * 100 / (normal + long) if normal + long else 0.0)
+            columns['playcount'].append(beatmap.get('play_count', 0))
+            columns['date'].append(to_timestamp(beatmap.get('date_submitted', mapset.get('date_submitted'))))
+
+        for token in set(_tokenize(mapset.get('title')) + _tokenize(mapset.get('artist'))):
+            self._postings.setdefault(token, []).append(row)
+        self._frozen = False
+
+    def _freeze(self) -> None:
+        for field, dtype in zip(self._FIELDS, self._DTYPES):
+            setattr(self, f'_{field}', np.asarray(self._columns[field], dtype=dtype))
+
+        # the postings of every word laid out in vocabulary order, so the rows of
+        # all the words sharing a prefix are one slice
+        self._vocabulary = sorted(self._postings)
+        postings = [self._postings[word] for word in self._vocabulary]
+        self._offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in postings], out=self._offsets[1:])
+        self._posting_rows = np.fromiter(
+            itertools.chain.from_iterable(postings), dtype=np.int32, count=int(self._offsets[-1]))
+
+        # the rows of the mapsets from the newest to the oldest id, and the position of the mapset of every map in it
+        ids = np.fromiter((mapset['id'] for mapset in self.mapsets), dtype=np.int64, count=len(self.mapsets))
+        self._order = np.argsort(-ids, kind='stable')
+        rank = np.empty(len(self.mapsets), dtype=np.int32)
+        rank[self._order] = np.arange(len(self.mapsets), dtype=np.int32)
+        self._map_rank = rank[self._mapset_row]
+        self._frozen = True
+
+    def _match_text(self, search: str) -> Optional[np.ndarray]:
+        tokens = _tokenize(search)
+        if not tokens:
+            return None
+        matched = np.ones(len(self.mapsets), dtype=bool)
+        vocabulary = self._vocabulary
+        for token in tokens:
+            start = bisect.bisect_left(vocabulary, token)
+            stop = bisect.bisect_left(vocabulary, token[:-1] + chr(ord(token[-1]) + 1), start)
+            hits = np.zeros(len(self.mapsets), dtype=bool)
+            hits[self._posting_rows[self._offsets[start]:self._offsets[stop]]] = True
+            matched &= hits
+        return matched
+
+    def search(
+        self,
+        search: str,
+        *,
+        mode: Union[GameMode, int],
+        status: Union[RankStatus, int],
+        pagination: Optional[bool] = False,
+        limit: Optional[int] = 50,
+        mindiff: Optional[int] = None,
+        maxdiff: Optional[int] = None,
+        minbpm: Optional[int] = None,
+        maxbpm: Optional[int] = None,
+        minlns: Optional[int] = None,
+        maxlns: Optional[int] = None,
+        minplaycount: Optional[int] = None,
+        maxplaycount: Optional[int] = None,
+        mindate: Optional[datetime.datetime] = None,
+        maxdate: Optional[datetime.datetime] = None
+    ) -> dict:
+        """
+        Searches the index, takes the same arguments as :meth:`MapsetsBasedRequests.search_mapset`.
+
+        A mapset matches when every word of ``search`` is a prefix of a word
+        in its title or artist and at least one of its maps passes every filter.
+        Results are ordered by mapset id, newest first.
+
+        Returns
+        -------
+        dict
+            A response shaped like the one of the API, with the matching mapsets under ``mapsets``.
+        """
+        if not self._frozen:
+            self._freeze()
+
+        mask = (self._mode == int(mode.value if isinstance(mode, GameMode) else mode)) & (
+            self._status == int(status.value if isinstance(status, RankStatus) else status))
+        for column, low, high in (
+            (self._diff, mindiff, maxdiff),
+            (self._bpm, minbpm, maxbpm),
+            (self._lns, minlns, maxlns),
+            (self._playcount, minplaycount, maxplaycount),
+            (self._date, mindate and int(mindate.timestamp()), maxdate and int(maxdate.timestamp())),
+        ):
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+
+        text = self._match_text(search)
+        if text is not None:
+            mask &= text[self._mapset_row]
+
+        found = np.zeros(len(self.mapsets), dtype=bool)
+        found[self._map_rank[mask]] = True
+        rows = self._order[np.flatnonzero(found)]
+
+        limit = int(limit)
+        start = int(pagination) * limit
+        return {'status': 200, 'mapsets': [self.mapsets[row] for row in rows[start:start + limit]]}
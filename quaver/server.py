@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import multidict
+from aiohttp import web
+
+from .endpoints import find_endpoint
+from .errors import APIDown, HTTPException, NotFound, RequestTimeout
+from .http import HTTPClient, Route
+
+__all__ = ('ProxyServer',)
+
+
+class ProxyServer:
+    """
+    A local caching proxy exposing the ``/v1`` routes of the API, run with ``python -m quaver serve``.
+
+    Every process of a host can point :class:`Quaver` at the proxy with
+    ``base_url='http://127.0.0.1:8080/v1'`` so they share one cache, one
+    rate limit and one set of connections to the API. Identical requests
+    arriving while one is in flight are coalesced into a single upstream
+    request, and bodies are served as the API sent them, without decoding.
+
+    Responses are cached for the ttl declared by their endpoint, requests
+    to paths which are not in :data:`ENDPOINTS` are forwarded uncached.
+
+    Attributes
+    ----------
+    client: HTTPClient
+        The client forwarding the requests to the API.
+    """
+
+    __slots__ = ('client',)
+
+    def __init__(self, client: HTTPClient) -> None:
+        self.client: HTTPClient = client
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        upstream: Optional[str] = None,
+        cache_size: int = 4096,
+        rate_limit: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> ProxyServer:
+        """
+        Creates a proxy with its own client.
+
+        Parameters
+        ----------
+        upstream: Optional[str]
+            The base url of the API, defaults to :attr:`Route.BASE_URL`.
+        cache_size: int
+            The amount of responses to cache.
+        rate_limit: Optional[float]
+            The amount of rate limit tokens to spend per second on upstream requests.
+        max_concurrency: Optional[int]
+            The maximum amount of upstream requests in flight.
+        timeout: Optional[float]
+            The amount of seconds to wait for an upstream request.
+        """
+        return cls(HTTPClient(
+            None, timeout=timeout, cache_size=cache_size, rate_limit=rate_limit,
+            max_concurrency=max_concurrency, raw=True, base_url=upstream
+        ))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        path = '/' + request.match_info['tail']
+        endpoint = find_endpoint(path)
+        params = list(request.query.items())
+        keys = [key for key, _ in params]
+        payload = (multidict.MultiDict(params) if len(keys) != len(set(keys)) else dict(params)) or None
+        route = Route(Route.BASE_URL + path, 'GET', payload, path, endpoint.key if endpoint else None, endpoint)
+        try:
+            body = await self.client.make_request(route, raw=True)
+        except NotFound as error:
+            return web.json_response({'error': error.message}, status=404)
+        except APIDown as error:
+            return web.json_response({'error': error.message}, status=500)
+        except RequestTimeout as error:
+            return web.json_response({'error': error.message}, status=504)
+        except HTTPException as error:
+            # rate limits are passed through so clients back off, other statuses are a bad gateway
+            return web.json_response({'error': error.message}, status=429 if error.status == 429 else 502)
+        except Exception as error:
+            return web.json_response({'error': str(error)}, status=502)
+        return web.Response(body=body, content_type='application/json')
+
+    async def _close(self, app: web.Application) -> None:
+        await self.client.close()
+
+    def make_app(self) -> web.Application:
+        """
+        Creates the aiohttp application serving the proxy, the client is closed on cleanup.
+        """
+        app = web.Application()
+        app.router.add_get('/v1/{tail:.*}', self.handle)
+        app.on_cleanup.append(self._close)
+        return app
+
+    def run(self, *, host: str = '127.0.0.1', port: int = 8080) -> None:
+        """
+        Serves the proxy until interrupted.
+        """
+        web.run_app(self.make_app(), host=host, port=port)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import collections
+import threading
+from typing import Any, List, Tuple
+
+__all__ = ('AccessStats',)
+
+AccessKey = Tuple[str, str, Tuple[Tuple[str, Any], ...]]
+
+
+class AccessStats:
+    """
+    Counts how often every resource was requested, cache hits included.
+
+    Only the ``maxsize`` most requested resources are kept, the counts of
+    the others are dropped whenever the table grows past twice that size.
+    The counts are thread-safe.
+
+    Attributes
+    ----------
+    maxsize: int
+        The amount of resources to keep the counts of.
+    """
+
+    __slots__ = ('maxsize', '_counts', '_lock')
+
+    def __init__(self, maxsize: int = 5000) -> None:
+        self.maxsize: int = maxsize
+        self._counts: collections.Counter[AccessKey] = collections.Counter()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, route) -> None:
+        """
+        Counts a request to a route built from an endpoint.
+        """
+        if route.endpoint is None:
+            return
+        key = (route.endpoint.name, route.path, tuple(route.params.items()) if route.params else ())
+        with self._lock:
+            counts = self._counts
+            counts[key] += 1
+            if len(counts) > 2 * self.maxsize:
+                self._counts = collections.Counter(dict(counts.most_common(self.maxsize)))
+
+    def most_common(self, n: int) -> List[Tuple[AccessKey, int]]:
+        """
+        Returns the ``n`` most requested resources as ``((endpoint, path, params), count)`` pairs.
+        """
+        with self._lock:
+            return self._counts.most_common(n)
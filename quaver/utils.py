@@ -0,0 +1,28 @@
+import datetime
+from typing import Union
+
+__all__ = ('to_timestamp',)
+
+
+def to_timestamp(value: Union[None, int, float, str, datetime.datetime]) -> int:
+    """
+    Converts a timestamp as returned by the API to unix seconds.
+
+    Parameters
+    ----------
+    value: Union[None, int, float, str, datetime.datetime]
+        An ISO 8601 string, a datetime or unix seconds.
+
+    Returns
+    -------
+    int
+        The unix timestamp, 0 if the value is None.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = value.replace('Z', '+00:00')
+    return int(datetime.datetime.fromisoformat(value).timestamp())
@@ -47,6 +47,7 @@ setup(name='quaver.py',
       long_description_content_type="text/x-rst",
       include_package_data=True,
       install_requires=['aiohttp'],
+      extras_require={'numpy': ['numpy']},
       python_requires='>=3.8.0',
       classifiers=[
         'Development Status :: 5 - Production/Stable',